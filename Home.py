@@ -1,102 +1,199 @@
 import streamlit as st
-import requests
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+import numpy as np
 import pandas as pd
-from collections import defaultdict
 from datetime import datetime
-import dateutil.parser
-import dateutil.tz
 
 from classes import Club, ElementType, Fixture, FplMatchup, FplTeam, LivePlayerData, Player
-from data_loader import load_all_data
-from field_viz import display_field_in_streamlit
-from utils import generate_match_commentary, calculate_league_table
+from data_loader import LIVE_POLL_MIN_INTERVAL, clear_live_data_cache, load_all_data, refresh_live_data
+from field_viz import display_field_in_streamlit, get_available_photo_codes
+from http_helpers import get_fixtures_json
+from styles import FORM_ICONS, NAV_CSS, RANK_ICONS, STANDINGS_CSS
+from utils import LOCAL_TZ, cached_match_commentary, calculate_league_table
 
-@st.cache_data(ttl=60)
+@st.cache_data(ttl=60, show_spinner=False)  # May run on a worker thread, so it must not write elements
 def get_fixtures():
-    """Fetch fixtures from API with caching."""
-    try:
-        fixtures_response = requests.get("https://fantasy.premierleague.com/api/fixtures/")
-        fixtures_response.raise_for_status()
-        return fixtures_response.json()
-    except Exception as e:
-        st.error(f"Error fetching fixtures: {e}")
-        return []
+    """Fetch fixtures from API with caching; failures raise (and are not cached) for the caller to report."""
+    return get_fixtures_json()
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _bucket_fixtures(fixtures):
+    """Group fixtures by gameweek in display order and format kickoff times, cached across reruns."""
+    events = np.array([f.get('event') or 0 for f in fixtures], dtype=np.int64)
+    _, kickoff_rank = np.unique(np.array([f.get('kickoff_time') or '' for f in fixtures], dtype=str), return_inverse=True)
+    finished = np.array([bool(f['finished_provisional']) for f in fixtures], dtype=bool)
+    live = np.array([bool(f['started']) for f in fixtures], dtype=bool) & ~finished
+    
+    # Sort once by gameweek, then Live -> Finished (newest first) -> Upcoming (soonest first)
+    status_rank = np.where(live, 0, np.where(finished, 1, 2))
+    kickoff_key = np.where(finished, -kickoff_rank, kickoff_rank)
+    order = np.lexsort((kickoff_key, status_rank, events))
+    
+    # Slice the sorted order into contiguous gameweek groups
+    gameweeks, group_starts = np.unique(events[order], return_index=True)
+    fixtures_by_gw = {
+        gw: [fixtures[i] for i in group]
+        for gw, group in zip(gameweeks.tolist(), np.split(order, group_starts[1:]))
+        if gw  # Only include fixtures with a gameweek
+    }
+    
+    # Parse and localize all kickoff times in one vectorized pass
+    kickoff_times = pd.to_datetime([f.get('kickoff_time') for f in fixtures], format='ISO8601', utc=True, errors='coerce')
+    kickoff_labels = kickoff_times.tz_convert(LOCAL_TZ).strftime('%b %d, %H:%M')
+    kickoff_by_fixture = {f['id']: label for f, label in zip(fixtures, kickoff_labels) if pd.notna(label)}
+    
+    return fixtures_by_gw, kickoff_by_fixture
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _build_league_form(matches, team_names):
+    """Render each league entry's last 5 finished results (gameweek order) as form HTML, cached across reruns."""
+    # Each entry keeps (result, tooltip) tuples; the deque drops anything older than 5
+    team_form = defaultdict(lambda: deque(maxlen=5))
+    
+    # Process matches in event (gameweek) order
+    for match in sorted(matches, key=lambda x: x.get('event', 0)):
+        if not match.get('finished'):
+            continue
+            
+        entry_1 = match.get('league_entry_1')
+        entry_2 = match.get('league_entry_2')
+        score_1 = match.get('league_entry_1_points')
+        score_2 = match.get('league_entry_2_points')
+        event = match.get('event')
+        
+        # Determine result for entry 1
+        if score_1 > score_2:
+            res_1 = 'W'
+            res_2 = 'L'
+        elif score_1 < score_2:
+            res_1 = 'L'
+            res_2 = 'W'
+        else:
+            res_1 = 'D'
+            res_2 = 'D'
+            
+        # Tooltip text is final here so the standings loop does no per-cell formatting
+        team_form[entry_1].append((res_1, f"GW{event}: {res_1} {score_1}-{score_2} vs {team_names.get(entry_2, 'Unknown')}"))
+        team_form[entry_2].append((res_2, f"GW{event}: {res_2} {score_2}-{score_1} vs {team_names.get(entry_1, 'Unknown')}"))
+    
+    # Plain dict of finished markup so reruns reuse the HTML and the cached value pickles without the default factory
+    return {entry_id: _form_html(form) for entry_id, form in team_form.items()}
+
+def _form_html(recent_form):
+    """Render (result, tooltip) pairs as form icons, accenting the most recent one."""
+    last = len(recent_form) - 1
+    return '<div class="form-container">' + ''.join(
+        f'<div class="form-char form-{res}{" form-recent" if i == last else ""}" data-tooltip="{tooltip}">{FORM_ICONS[res]}</div>'
+        for i, (res, tooltip) in enumerate(recent_form)
+    ) + '</div>'
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _render_epl_table_html(teams, fixtures):
+    """Build the EPL standings table HTML, cached so reruns reuse the finished markup."""
+    league_table = calculate_league_table(teams, fixtures)
+    
+    # Build HTML table like FPL standings
+    epl_html_rows = []
+    
+    for row in league_table.itertuples(index=False):
+        # Build form HTML with circular icons and tooltips (last 5 detailed results)
+        form_html = _form_html([(match['result'], match['tooltip']) for match in row.FormDetails[-5:]])
+        
+        # Calculate rank movement
+        pos = row.Pos
+        prev_pos = row.PrevPos
+        rank_icon = RANK_ICONS[int(np.sign(prev_pos - pos))]
+        
+        rank_html = f'<div class="rank-container">{pos}{rank_icon}</div>'
+        
+        row_html = f"""<tr>
+    <td>{rank_html}</td>
+    <td><img src="{row.Logo}" width="24" style="vertical-align: middle; margin-right: 8px;">{row.Team}</td>
+    <td>{row.P}</td>
+    <td>{row.W}</td>
+    <td>{row.D}</td>
+    <td>{row.L}</td>
+    <td>{row.GF}</td>
+    <td>{row.GA}</td>
+    <td>{row.GD}</td>
+    <td><strong>{row.Pts}</strong></td>
+    <td>{form_html}</td>
+</tr>"""
+        epl_html_rows.append(row_html)
+    
+    epl_table_html = f"""<table class="standings-table">
+    <thead>
+        <tr>
+            <th>Pos</th>
+            <th>Team</th>
+            <th>P</th>
+            <th>W</th>
+            <th>D</th>
+            <th>L</th>
+            <th>GF</th>
+            <th>GA</th>
+            <th>GD</th>
+            <th>Pts</th>
+            <th>Form</th>
+        </tr>
+    </thead>
+    <tbody>
+        {"".join(epl_html_rows)}
+    </tbody>
+</table>"""
+    
+    return epl_table_html
+
+def _set_page(page):
+    """Navigation button callback."""
+    st.session_state.current_page = page
 
 def main():
     st.set_page_config(page_title="Matches", page_icon="⚽", layout="wide", initial_sidebar_state="collapsed")
     
     # Hide sidebar and add top navigation
-    st.markdown("""
-        <style>
-        [data-testid="stSidebar"] {
-            display: none;
-        }
-        [data-testid="stSidebarCollapsedControl"] {
-            display: none;
-        }
-        .top-nav {
-            position: fixed;
-            top: 0;
-            left: 0;
-            right: 0;
-            display: flex;
-            align-items: center;
-            gap: 24px;
-            padding: 12px 24px;
-            background: #0e1117;
-            border-bottom: 1px solid #333;
-            z-index: 999999;
-        }
-        .nav-link {
-            color: #a0a0a0 !important;
-            text-decoration: none !important;
-            font-size: 16px;
-            font-weight: 500;
-            padding: 8px 16px;
-            border-radius: 4px;
-            transition: all 0.2s;
-        }
-        .nav-link:hover {
-            color: #ffffff !important;
-            background: rgba(255,255,255,0.1);
-            text-decoration: none !important;
-        }
-        .nav-link.active {
-            color: #ffffff !important;
-            background: rgba(255,255,255,0.15);
-        }
-        /* Add padding to content to account for fixed nav */
-        .main .block-container {
-            padding-top: 20px !important;
-        }
-        </style>
-    """, unsafe_allow_html=True)
+    st.markdown(NAV_CSS, unsafe_allow_html=True)
     
     # Initialize session state for page
     if 'current_page' not in st.session_state:
         st.session_state.current_page = 'Matches'
     
-    # Navigation using Streamlit columns and buttons
+    # Navigation using Streamlit columns and buttons; callbacks switch the page before the
+    # click's rerun starts, so a page change costs one script run instead of two
     nav_col1, nav_col2, nav_col3 = st.columns([1, 1, 6])
     with nav_col1:
-        if st.button("⚽ Matches", use_container_width=True, type="primary" if st.session_state.current_page == 'Matches' else "secondary"):
-            st.session_state.current_page = 'Matches'
-            st.rerun()
+        st.button("⚽ Matches", use_container_width=True, type="primary" if st.session_state.current_page == 'Matches' else "secondary",
+                  on_click=_set_page, args=('Matches',))
     with nav_col2:
-        if st.button("🏆 Standings", use_container_width=True, type="primary" if st.session_state.current_page == 'Standings' else "secondary"):
-            st.session_state.current_page = 'Standings'
-            st.rerun()
+        st.button("🏆 Standings", use_container_width=True, type="primary" if st.session_state.current_page == 'Standings' else "secondary",
+                  on_click=_set_page, args=('Standings',))
     
     st.divider()
     
-    # Load all shared data first to get gameweek
-    data = load_all_data()
+    # On a session's first run, fetch fixtures in the background while the shared data loads, so page load
+    # waits for the slower of the two; later runs are served from caches, so no thread is needed
+    if 'app_data' in st.session_state:
+        data = load_all_data()
+        fetch_fixtures = get_fixtures
+    else:
+        script_ctx = get_script_run_ctx()
+        with ThreadPoolExecutor(max_workers=1, initializer=lambda: add_script_run_ctx(threading.current_thread(), script_ctx)) as executor:
+            fixtures_future = executor.submit(get_fixtures)
+            data = load_all_data()
+        fetch_fixtures = fixtures_future.result
+    
+    # Fetch errors are reported here, on the main thread
+    try:
+        fixtures = fetch_fixtures()
+    except Exception as e:
+        st.error(f"Error fetching fixtures: {e}")
+        fixtures = []
     current_gameweek = data['current_gameweek']
     teams = data['teams']
     
-    # Get fixtures with caching
-    fixtures = get_fixtures()
-    
     if not teams or not fixtures:
         st.warning("No data available.")
         return
@@ -114,296 +211,324 @@ def render_matches_page(data, fixtures, current_gameweek):
         st.title(f"Gameweek {current_gameweek}")
     with col2:
         if st.button("Refresh Data"):
-            st.cache_data.clear()
+            # Only live scores and fixtures go stale; bootstrap/league caches stay warm
+            clear_live_data_cache()
+            get_fixtures.clear()
             st.rerun()
 
     # Create tabs
     tab1, tab2 = st.tabs(["Fantasy Head-to-Head", "Premier League Games"])
     
     with tab1:
-        
-        # Get data from shared loader
-        element_types_map = data['element_types_map']
-        all_clubs_map = data['all_clubs_map']
-        all_players_map = data['all_players_map']
-        live_player_data_map = data['live_player_data_map']
-        fpl_team_map = data['fpl_team_map']
-        
-        # Get live fixtures from live_json
-        live_json = data['live_json']
-        live_fixtures_json = live_json.get('fixtures', [])
-        
-        live_fixtures = [
-            Fixture(
-                home_team=fixture.get('team_h'),
-                away_team=fixture.get('team_a'),
-                home_score=fixture.get('team_h_score'),
-                away_score=fixture.get('team_a_score'),
-                started=fixture.get('started'),
-                finished_provisional=fixture.get('finished_provisional')
-            ) for fixture in live_fixtures_json]
-        
-        # Get league matchups
-        league_json = data['league_json']
-        matches = league_json.get('matches', [])
-        fpl_matchups = []
-        for match in matches:
-            if match.get('event') == current_gameweek:
-                fpl_matchups.append(FplMatchup(match.get('league_entry_1'), match.get('league_entry_1_points'), match.get('league_entry_2'), match.get('league_entry_2_points')))
-    
-        if not fpl_matchups:
-            st.info("No matches found for this gameweek.")
-        else:
-            for matchup in fpl_matchups:
-                fpl_team_1 = fpl_team_map.get(int(matchup.fpl_team_id_1))
-                fpl_team_2 = fpl_team_map.get(int(matchup.fpl_team_id_2))
-                
-                if not fpl_team_1 or not fpl_team_2:
-                    continue
-                    
-                team1_xi = sorted(fpl_team_1.players[:11], key=lambda p: p.element_type, reverse=True)
-                team2_xi = sorted(fpl_team_2.players[:11], key=lambda p: p.element_type, reverse=True)
-                
-                # Get Bench Players (remaining players)
-                team1_bench = fpl_team_1.players[11:]
-                team2_bench = fpl_team_2.players[11:]
-                
-                # Calculate actual scores from live player data (more up-to-date than matchup data)
-                team1_points = sum(live_player_data_map.get(p.id).points if live_player_data_map.get(p.id) else 0 for p in team1_xi)
-                team2_points = sum(live_player_data_map.get(p.id).points if live_player_data_map.get(p.id) else 0 for p in team2_xi)
-                
-                with st.container(border=True):
-                    # Match Header
-                    col1, col2, col3 = st.columns([4, 2, 4])
-                    
-                    with col1:
-                        st.markdown(f"<h3 style='text-align: center;'>{fpl_team_1.team_name}</h3>", unsafe_allow_html=True)
-                        st.markdown(f"<p style='text-align: center; color: gray;'>{fpl_team_1.manager_name}</p>", unsafe_allow_html=True)
-                        
-                    with col2:
-                        st.markdown(f"<h1 style='text-align: center;'>{team1_points} - {team2_points}</h1>", unsafe_allow_html=True)
-                        
-                    with col3:
-                        st.markdown(f"<h3 style='text-align: center;'>{fpl_team_2.team_name}</h3>", unsafe_allow_html=True)
-                        st.markdown(f"<p style='text-align: center; color: gray;'>{fpl_team_2.manager_name}</p>", unsafe_allow_html=True)
-                    
-                    st.divider()
-                    
-                    # Generate and display satirical commentary
-                    commentary = generate_match_commentary(
-                        fpl_team_1, fpl_team_2, 
-                        team1_points, team2_points,
-                        team1_xi, team2_xi,
-                        live_player_data_map, element_types_map,
-                        live_fixtures
-                    )
-                    st.markdown(f"**Match Commentary:** {commentary}")
-                    st.divider()
-                    
-                    # Display fields side by side
-                    c1, c2 = st.columns(2)
-                    
-                    # Create a mapping of club_id to fixture status for color coding
-                    club_fixture_status_map = {}
-                    for fixture in live_fixtures:
-                        # For home team
-                        if fixture.home_team not in club_fixture_status_map:
-                            club_fixture_status_map[fixture.home_team] = {
-                                'finished': fixture.finished_provisional,
-                                'started': fixture.started
-                            }
-                        # For away team
-                        if fixture.away_team not in club_fixture_status_map:
-                            club_fixture_status_map[fixture.away_team] = {
-                                'finished': fixture.finished_provisional,
-                                'started': fixture.started
-                            }
-                    
-                    with c1:
-                        display_field_in_streamlit(team1_xi, live_player_data_map, 
-                                                 element_types_map, fpl_team_1.team_name, 
-                                                 club_fixture_status_map, team1_bench)
-                    with c2:
-                        display_field_in_streamlit(team2_xi, live_player_data_map,
-                                                 element_types_map, fpl_team_2.team_name, 
-                                                 club_fixture_status_map, team2_bench)
+        render_fpl_matchups(current_gameweek)
 
     with tab2:
         
         # Get data from shared loader
-        current_gw = data['current_gameweek']
-        element_types_map = data['element_types_map']
-        all_players_map = data['all_players_map']
+        position_names = data['position_names']
         fpl_team_map = data['fpl_team_map']
-        live_player_data_map = data['live_player_data_map']
-        teams = data['teams']
+        team_map = data['team_map']
         
-        # Create a map for team details
-        team_map = {team['id']: team for team in teams}
+        # Goalkeepers and defenders who played 60+ minutes, found with one vectorized mask
+        live_player_arrays = data['live_player_arrays']
+        clean_sheet_mask = np.isin(live_player_arrays['element_type'], (1, 2)) & (live_player_arrays['minutes'] >= 60)
+        clean_sheet_candidates = set(np.flatnonzero(clean_sheet_mask).tolist())
         
-        # Group fixtures by gameweek
-        fixtures_by_gw = defaultdict(list)
-        for fixture in fixtures:
-            if fixture.get('event'):  # Only include fixtures with a gameweek
-                fixtures_by_gw[fixture['event']].append(fixture)
+        # Starting XI players with live data indexed by club, so each fixture only needs two lookups
+        club_to_fpl_players = data['club_to_fpl_players']
         
-        # Sort each gameweek's fixtures by kickoff time
-        for gw in fixtures_by_gw:
-            fixtures_by_gw[gw].sort(key=lambda x: x.get('kickoff_time', ''))
+        # Bucketed fixtures and formatted kickoff times are shared across reruns
+        fixtures_by_gw, kickoff_by_fixture = _bucket_fixtures(fixtures)
         
         # Only show gameweeks up to and including the current gameweek
-        gameweeks = sorted([gw for gw in fixtures_by_gw.keys() if gw <= current_gw], reverse=True)
+        gameweeks = sorted([gw for gw in fixtures_by_gw.keys() if gw <= current_gameweek], reverse=True)
         
         # Display fixtures grouped by gameweek
         for gw in gameweeks:
-            gw_fixtures = fixtures_by_gw[gw]
-            
-            # Sort fixtures: Live -> Finished (newest first) -> Upcoming (soonest first)
-            live_matches = []
-            finished_matches = []
-            upcoming_matches = []
-            
-            for f in gw_fixtures:
-                if f['started'] and not f['finished_provisional']:
-                    live_matches.append(f)
-                elif f['finished_provisional']:
-                    finished_matches.append(f)
-                else:
-                    upcoming_matches.append(f)
-            
-            # Sort finished matches by kickoff time descending (most recent first)
-            finished_matches.sort(key=lambda x: x.get('kickoff_time', ''), reverse=True)
+            render_gameweek_fixtures(gw, gw == current_gameweek, fixtures_by_gw[gw], team_map, fpl_team_map, club_to_fpl_players,
+                                     kickoff_by_fixture, position_names, clean_sheet_candidates)
+
+@st.fragment(run_every=LIVE_POLL_MIN_INTERVAL)
+def render_fpl_matchups(current_gameweek):
+    """Render the head-to-head matchups, re-running on its own to pick up live scores."""
+    # Live stats are re-fetched when the polling backoff allows; everything else comes from the session
+    data = refresh_live_data()
+    element_types_map = data['element_types_map']
+    live_player_data_map = data['live_player_data_map']
+    fpl_team_map = data['fpl_team_map']
+    
+    # Live points and minutes indexed by player id (0 for players without live data)
+    points_by_player = data['live_player_arrays']['points']
+    minutes_by_player = data['live_player_arrays']['minutes']
+    
+    # Get live fixtures from live_json
+    live_json = data['live_json']
+    live_fixtures_json = live_json.get('fixtures', [])
+    
+    live_fixtures = [
+        Fixture(
+            home_team=fixture.get('team_h'),
+            away_team=fixture.get('team_a'),
+            home_score=fixture.get('team_h_score'),
+            away_score=fixture.get('team_a_score'),
+            started=fixture.get('started'),
+            finished_provisional=fixture.get('finished_provisional')
+        ) for fixture in live_fixtures_json]
+    
+    # Get league matchups
+    league_json = data['league_json']
+    matches = league_json.get('matches', [])
+    fpl_matchups = [
+        FplMatchup(match.get('league_entry_1'), match.get('league_entry_1_points'), match.get('league_entry_2'), match.get('league_entry_2_points'))
+        for match in matches
+        if match.get('event') == current_gameweek
+    ]
+    
+    # Kickoff state of every live fixture, part of the commentary cache key (yet-to-play counts depend on it)
+    fixture_started_key = tuple(bool(fixture.started) for fixture in live_fixtures)
+    
+    # Create a mapping of club_id to fixture status for color coding (shared by all matchups)
+    club_fixture_status_map = {}
+    for fixture in live_fixtures:
+        for club_id in (fixture.home_team, fixture.away_team):
+            club_fixture_status_map.setdefault(club_id, {
+                'finished': fixture.finished_provisional,
+                'started': fixture.started
+            })
+    
+    if not fpl_matchups:
+        st.info("No matches found for this gameweek.")
+    else:
+        # Probe every displayed player's photo in one concurrent, day-cached batch
+        available_photo_codes = get_available_photo_codes(tuple(sorted({
+            player.code
+            for matchup in fpl_matchups
+            for team_id in (matchup.fpl_team_id_1, matchup.fpl_team_id_2)
+            if int(team_id) in fpl_team_map
+            for player in fpl_team_map[int(team_id)].starting_xi
+        })))
+        
+        for matchup in fpl_matchups:
+            fpl_team_1 = fpl_team_map.get(int(matchup.fpl_team_id_1))
+            fpl_team_2 = fpl_team_map.get(int(matchup.fpl_team_id_2))
             
-            # Sort upcoming matches by kickoff time ascending (soonest first)
-            upcoming_matches.sort(key=lambda x: x.get('kickoff_time', ''))
+            if not fpl_team_1 or not fpl_team_2:
+                continue
+                
+            team1_xi = fpl_team_1.xi_sorted
+            team2_xi = fpl_team_2.xi_sorted
             
-            # Combine back together
-            sorted_fixtures = live_matches + finished_matches + upcoming_matches
+            # Get Bench Players (remaining players)
+            team1_bench = fpl_team_1.bench
+            team2_bench = fpl_team_2.bench
             
-            # Gameweek header
-            gw_label = f"### Gameweek {gw}"
-            if gw == current_gw:
-                gw_label += " (Current)"
-            st.markdown(gw_label)
-            st.divider()
+            # Calculate actual scores from live player data (more up-to-date than matchup data)
+            team1_points = int(points_by_player[fpl_team_1.xi_ids].sum())
+            team2_points = int(points_by_player[fpl_team_2.xi_ids].sum())
             
-            for fixture in sorted_fixtures:
-                home_team = team_map.get(fixture['team_h'])
-                away_team = team_map.get(fixture['team_a'])
+            with st.container(border=True):
+                # Match Header
+                col1, col2, col3 = st.columns([4, 2, 4])
                 
-                if not home_team or not away_team:
-                    continue
+                with col1:
+                    st.markdown(f"<h3 style='text-align: center;'>{fpl_team_1.team_name}</h3>", unsafe_allow_html=True)
+                    st.markdown(f"<p style='text-align: center; color: gray;'>{fpl_team_1.manager_name}</p>", unsafe_allow_html=True)
+                    
+                with col2:
+                    st.markdown(f"<h1 style='text-align: center;'>{team1_points} - {team2_points}</h1>", unsafe_allow_html=True)
+                    
+                with col3:
+                    st.markdown(f"<h3 style='text-align: center;'>{fpl_team_2.team_name}</h3>", unsafe_allow_html=True)
+                    st.markdown(f"<p style='text-align: center; color: gray;'>{fpl_team_2.manager_name}</p>", unsafe_allow_html=True)
                 
-                is_finished = fixture['finished_provisional']
-                is_started = fixture['started']
+                st.divider()
                 
-                # Find FPL teams with players in this match
-                home_team_id = fixture['team_h']
-                away_team_id = fixture['team_a']
+                # Generate and display satirical commentary, regenerated only when the match state changes
+                xi_ids = np.concatenate((fpl_team_1.xi_ids, fpl_team_2.xi_ids))
+                commentary_key = (
+                    fpl_team_1.id, fpl_team_2.id, team1_points, team2_points,
+                    tuple(points_by_player[xi_ids].tolist()), tuple(minutes_by_player[xi_ids].tolist()),
+                    fixture_started_key
+                )
+                commentary = cached_match_commentary(
+                    commentary_key,
+                    fpl_team_1, fpl_team_2, 
+                    team1_points, team2_points,
+                    team1_xi, team2_xi,
+                    live_player_data_map, element_types_map,
+                    live_fixtures
+                )
+                st.markdown(f"**Match Commentary:** {commentary}")
+                st.divider()
                 
-                fpl_teams_involved = {}
-                for fpl_team_id, fpl_team in fpl_team_map.items():
-                    players_in_match = []
-                    for player in fpl_team.players[:11]:  # Only starting XI
-                        if player.club_id in [home_team_id, away_team_id]:
-                            live_data = live_player_data_map.get(player.id)
-                            if live_data:
-                                players_in_match.append({
-                                    'player': player,
-                                    'live_data': live_data
-                                })
-                    
-                    if players_in_match:
-                        fpl_teams_involved[fpl_team_id] = {
-                            'team': fpl_team,
-                            'players': players_in_match
-                        }
+                # Display fields side by side
+                c1, c2 = st.columns(2)
                 
-                with st.container(border=True):
-                    col1, col2, col3 = st.columns([4, 2, 4])
+                with c1:
+                    display_field_in_streamlit(team1_xi, live_player_data_map, 
+                                             element_types_map, fpl_team_1.team_name, 
+                                             club_fixture_status_map, team1_bench, available_photo_codes)
+                with c2:
+                    display_field_in_streamlit(team2_xi, live_player_data_map,
+                                             element_types_map, fpl_team_2.team_name, 
+                                             club_fixture_status_map, team2_bench, available_photo_codes)
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _render_finished_fixture_html(fixture_id, header_html, team_tabs):
+    """Build the full markdown for a finished fixture, with each FPL team in a collapsible section."""
+    blocks = [header_html]
+    if team_tabs:
+        blocks.append("<hr>")
+        blocks.append("**FPL Teams with Players:**")
+        for tab_name, player_lines in team_tabs:
+            # Blank lines around the player lines keep them rendered as markdown inside the HTML block
+            blocks.append(f"<details><summary>{tab_name}</summary>")
+            blocks.extend(player_lines)
+            blocks.append("</details>")
+    return "\n\n".join(blocks)
+
+def _build_fixture_team_tabs(fixture, fpl_team_map, club_to_fpl_players, position_names, clean_sheet_candidates):
+    """Build (tab name, player stat lines) for each FPL team with starters in a fixture."""
+    is_finished = fixture['finished_provisional']
+    
+    # Find FPL teams with players in this match
+    home_team_id = fixture['team_h']
+    away_team_id = fixture['team_a']
+    
+    fpl_teams_involved = {}
+    candidates = club_to_fpl_players.get(home_team_id, []) + club_to_fpl_players.get(away_team_id, [])
+    for fpl_team_id, player, live_data in candidates:
+        if fpl_team_id not in fpl_teams_involved:
+            fpl_teams_involved[fpl_team_id] = {
+                'team': fpl_team_map[fpl_team_id],
+                'players': []
+            }
+        fpl_teams_involved[fpl_team_id]['players'].append({
+            'player': player,
+            'live_data': live_data
+        })
+    
+    # Clubs that kept a clean sheet in this fixture (kept per fixture since a club can play twice in a gameweek)
+    clean_sheet_clubs = set()
+    if is_finished:
+        if fixture['team_a_score'] == 0:
+            clean_sheet_clubs.add(home_team_id)
+        if fixture['team_h_score'] == 0:
+            clean_sheet_clubs.add(away_team_id)
+    
+    # Stat lines for each FPL team's players in this fixture
+    team_tabs = []
+    for team_data in fpl_teams_involved.values():
+        player_lines = []
+        for player_data in team_data['players']:
+            player = player_data['player']
+            live_data = player_data['live_data']
+            position = position_names[player.element_type]
+            
+            # Build stats string
+            stats_parts = [
+                f"**{player.name}** ({position})",
+                f"Pts: {live_data.points}",
+                f"Mins: {live_data.minutes}"
+            ]
+            
+            if live_data.goals > 0:
+                stats_parts.append(f"⚽ {live_data.goals}")
+            if live_data.assists > 0:
+                stats_parts.append(f"🅰️ {live_data.assists}")
+            
+            # Show clean sheet for defenders and goalkeepers who played 60+ minutes
+            if player.club_id in clean_sheet_clubs and player.id in clean_sheet_candidates:
+                stats_parts.append("🛡️ CS")
+            
+            player_lines.append(" | ".join(stats_parts))
+        
+        tab_name = f"{team_data['team'].team_name} ({team_data['team'].manager_name})"
+        team_tabs.append((tab_name, tuple(player_lines)))
+    
+    return team_tabs
+
+@st.fragment
+def render_gameweek_fixtures(gw, is_current, sorted_fixtures, team_map, fpl_team_map, club_to_fpl_players,
+                             kickoff_by_fixture, position_names, clean_sheet_candidates):
+    """Render one gameweek of Premier League fixtures as an isolated fragment."""
+    # Gameweek header
+    gw_label = f"### Gameweek {gw}"
+    if is_current:
+        gw_label += " (Current)"
+    st.markdown(gw_label)
+    st.divider()
+    
+    for fixture in sorted_fixtures:
+        home_team = team_map.get(fixture['team_h'])
+        away_team = team_map.get(fixture['team_a'])
+        
+        if not home_team or not away_team:
+            continue
+        
+        is_finished = fixture['finished_provisional']
+        is_started = fixture['started']
+        
+        # Score (or kickoff time) block shown between the two badges
+        if is_finished or is_started:
+            score_html = f"{fixture['team_h_score']} - {fixture['team_a_score']}"
+            status_label = "FT" if is_finished else "LIVE"
+        else:
+            score_html = "vs"
+            kickoff = fixture.get('kickoff_time', '')
+            # Kickoff time already formatted in local timezone, fall back to raw UTC
+            status_label = kickoff_by_fixture.get(fixture['id'], kickoff[:16].replace('T', ' ')) if kickoff else ''
+        
+        # Single HTML block for the whole fixture header (one Streamlit element)
+        header_html = f"""<div style='display: flex; align-items: center;'>
+<div style='flex: 4; text-align: center;'><img src="{home_team['badge_url']}" width="50"><p><strong>{home_team['name']}</strong></p></div>
+<div style='flex: 2; text-align: center; padding-top: 20px;'><h3>{score_html}</h3><p style='color: gray; font-size: 14px;'>{status_label}</p></div>
+<div style='flex: 4; text-align: center;'><img src="{away_team['badge_url']}" width="50"><p><strong>{away_team['name']}</strong></p></div>
+</div>"""
+        
+        # Player stat lines per FPL team; finished fixtures reuse the session memo until live data is rebuilt
+        if is_finished:
+            fixture_tabs_memo = st.session_state.setdefault('finished_fixture_tabs', {})
+            memo = fixture_tabs_memo.get(fixture['id'])
+            if memo is None or memo[0] is not club_to_fpl_players:
+                memo = fixture_tabs_memo[fixture['id']] = (
+                    club_to_fpl_players,
+                    _build_fixture_team_tabs(fixture, fpl_team_map, club_to_fpl_players, position_names, clean_sheet_candidates),
+                )
+            team_tabs = memo[1]
+        else:
+            team_tabs = _build_fixture_team_tabs(fixture, fpl_team_map, club_to_fpl_players, position_names, clean_sheet_candidates)
+        
+        with st.container(border=True):
+            # Finished fixtures no longer change, so emit them as one cached markdown block
+            if is_finished:
+                st.markdown(_render_finished_fixture_html(fixture['id'], header_html, tuple(team_tabs)), unsafe_allow_html=True)
+            else:
+                st.markdown(header_html, unsafe_allow_html=True)
+                
+                # Display FPL teams with players involved
+                if team_tabs:
+                    st.divider()
+                    st.markdown("**FPL Teams with Players:**")
                     
-                    with col1:
-                        st.markdown(f"<div style='text-align: center;'>", unsafe_allow_html=True)
-                        st.image(f"https://resources.premierleague.com/premierleague/badges/50/t{home_team['code']}.png", width=50)
-                        st.markdown(f"**{home_team['name']}**</div>", unsafe_allow_html=True)
-                        
-                    with col2:
-                        st.markdown(f"<div style='text-align: center; padding-top: 20px;'>", unsafe_allow_html=True)
-                        if is_finished:
-                            st.markdown(f"<h3>{fixture['team_h_score']} - {fixture['team_a_score']}</h3>", unsafe_allow_html=True)
-                            st.caption("FT")
-                        elif is_started:
-                            st.markdown(f"<h3>{fixture['team_h_score']} - {fixture['team_a_score']}</h3>", unsafe_allow_html=True)
-                            st.caption("LIVE")
-                        else:
-                            st.markdown(f"<h3>vs</h3>", unsafe_allow_html=True)
-                            kickoff = fixture.get('kickoff_time', '')
-                            if kickoff:
-                                # Format kickoff time to local timezone
-                                try:
-                                    # Parse UTC time
-                                    dt_utc = dateutil.parser.isoparse(kickoff)
-                                    # Convert to local time
-                                    dt_local = dt_utc.astimezone(dateutil.tz.tzlocal())
-                                    st.caption(dt_local.strftime('%b %d, %H:%M'))
-                                except Exception as e:
-                                    st.caption(kickoff[:16].replace('T', ' '))
-                        st.markdown("</div>", unsafe_allow_html=True)
-                        
-                    with col3:
-                        st.markdown(f"<div style='text-align: center;'>", unsafe_allow_html=True)
-                        st.image(f"https://resources.premierleague.com/premierleague/badges/50/t{away_team['code']}.png", width=50)
-                        st.markdown(f"**{away_team['name']}**</div>", unsafe_allow_html=True)
+                    # Create tabs for each FPL team
+                    tabs = st.tabs([tab_name for tab_name, _ in team_tabs])
                     
-                    # Display FPL teams with players involved
-                    if fpl_teams_involved:
-                        st.divider()
-                        st.markdown("**FPL Teams with Players:**")
-                        
-                        # Create tabs for each FPL team
-                        tab_names = [f"{team_data['team'].team_name} ({team_data['team'].manager_name})" 
-                                     for team_data in fpl_teams_involved.values()]
-                        tabs = st.tabs(tab_names)
-                        
-                        for tab, (fpl_team_id, team_data) in zip(tabs, fpl_teams_involved.items()):
-                            with tab:
-                                fpl_team = team_data['team']
-                                players_data = team_data['players']
-                                
-                                for player_data in players_data:
-                                    player = player_data['player']
-                                    live_data = player_data['live_data']
-                                    position = element_types_map[player.element_type].position_name
-                                    
-                                    # Build stats string
-                                    stats_parts = [
-                                        f"**{player.name}** ({position})",
-                                        f"Pts: {live_data.points}",
-                                        f"Mins: {live_data.minutes}"
-                                    ]
-                                    
-                                    if live_data.goals > 0:
-                                        stats_parts.append(f"⚽ {live_data.goals}")
-                                    if live_data.assists > 0:
-                                        stats_parts.append(f"🅰️ {live_data.assists}")
-                                    
-                                    # Show clean sheet for defenders and goalkeepers
-                                    if player.element_type in [1, 2]:  # GK or DEF
-                                        if is_finished and live_data.minutes >= 60:
-                                            # Check if player's team kept a clean sheet
-                                            player_team_score = fixture['team_a_score'] if player.club_id == home_team_id else fixture['team_h_score']
-                                            if player_team_score == 0:
-                                                stats_parts.append("🛡️ CS")
-                                    
-                                    st.markdown(" | ".join(stats_parts))
-            
-            # Add spacing between gameweeks
-            st.markdown("<br>", unsafe_allow_html=True)
+                    for tab, (_, player_lines) in zip(tabs, team_tabs):
+                        with tab:
+                            # One markdown element per tab instead of one per player
+                            st.markdown("\n\n".join(player_lines))
+    
+    # Add spacing between gameweeks
+    st.markdown("<br>", unsafe_allow_html=True)
 
 def render_standings_page(data, fixtures):
     """Render the Standings page content."""
     st.title("🏆 Standings")
     
+    # CSS shared by the FPL and EPL tables
+    st.markdown(STANDINGS_CSS, unsafe_allow_html=True)
+    
     league_json = data['league_json']
     fpl_team_map = data['fpl_team_map']
     teams = data['teams']
@@ -417,169 +542,9 @@ def render_standings_page(data, fixtures):
         if not standings_json:
             st.error("No standings data available.")
         else:
-            # Process matches for form
-            matches = league_json.get('matches', [])
-            team_form = {}
-            
-            # Sort matches by event (gameweek)
-            matches.sort(key=lambda x: x.get('event', 0))
-            
-            for match in matches:
-                if not match.get('finished'):
-                    continue
-                    
-                entry_1 = match.get('league_entry_1')
-                entry_2 = match.get('league_entry_2')
-                score_1 = match.get('league_entry_1_points')
-                score_2 = match.get('league_entry_2_points')
-                event = match.get('event')
-                
-                # Initialize if not exists
-                if entry_1 not in team_form: team_form[entry_1] = []
-                if entry_2 not in team_form: team_form[entry_2] = []
-                
-                # Determine result for entry 1
-                if score_1 > score_2:
-                    res_1 = 'W'
-                    res_2 = 'L'
-                elif score_1 < score_2:
-                    res_1 = 'L'
-                    res_2 = 'W'
-                else:
-                    res_1 = 'D'
-                    res_2 = 'D'
-                    
-                # Store tuple: (result, score_str, opponent_name)
-                team_form[entry_1].append({
-                    'result': res_1,
-                    'score': f"{score_1}-{score_2}",
-                    'opponent': entry_2,
-                    'event': event
-                })
-                team_form[entry_2].append({
-                    'result': res_2,
-                    'score': f"{score_2}-{score_1}",
-                    'opponent': entry_1,
-                    'event': event
-                })
-        
-            # CSS for the table
-            st.markdown("""
-                <style>
-                .standings-table {
-                    width: 100%;
-                    border-collapse: collapse;
-                    font-family: sans-serif;
-                    font-size: 0.9rem;
-                }
-                .standings-table th {
-                    text-align: left;
-                    padding: 8px;
-                    border-bottom: 2px solid #333;
-                    color: #888;
-                    font-weight: 600;
-                }
-                .standings-table td {
-                    padding: 8px;
-                    border-bottom: 1px solid #333;
-                    vertical-align: middle;
-                }
-                .standings-table tr:hover {
-                    background-color: rgba(255, 255, 255, 0.05);
-                }
-                .form-container {
-                    display: flex;
-                    align-items: center;
-                    gap: 4px;
-                }
-                .form-char {
-                    display: flex;
-                    justify-content: center;
-                    align-items: center;
-                    width: 24px;
-                    height: 24px;
-                    border-radius: 50%;
-                    font-weight: bold;
-                    color: white;
-                    font-size: 14px;
-                    cursor: default;
-                    position: relative;
-                }
-                .form-W { background-color: #00b866; }
-                .form-D { background-color: #888888; }
-                .form-L { background-color: #d81b60; }
-                
-                /* Custom tooltip - faster than native */
-                .form-char[data-tooltip] {
-                    position: relative;
-                }
-                .form-char[data-tooltip]::before {
-                    content: attr(data-tooltip);
-                    position: absolute;
-                    bottom: 100%;
-                    left: 50%;
-                    transform: translateX(-50%);
-                    padding: 6px 10px;
-                    background: rgba(0, 0, 0, 0.9);
-                    color: white;
-                    font-size: 11px;
-                    white-space: nowrap;
-                    border-radius: 4px;
-                    opacity: 0;
-                    pointer-events: none;
-                    transition: opacity 0.15s ease-in-out;
-                    z-index: 1000;
-                    margin-bottom: 5px;
-                }
-                .form-char[data-tooltip]:hover::before {
-                    opacity: 1;
-                    transition-delay: 0s;
-                }
-                
-                /* Accent for the most recent result */
-                .form-recent::after {
-                    content: '';
-                    position: absolute;
-                    top: -3px;
-                    left: -3px;
-                    right: -3px;
-                    bottom: -3px;
-                    border-radius: 50%;
-                    border: 2px solid;
-                }
-                .form-recent.form-W::after { border-color: #00b866; }
-                .form-recent.form-D::after { border-color: #888888; }
-                .form-recent.form-L::after { border-color: #d81b60; }
-                
-                /* Rank movement icons */
-                .rank-container {
-                    display: flex;
-                    align-items: center;
-                    gap: 6px;
-                }
-                .rank-icon {
-                    display: inline-flex;
-                    justify-content: center;
-                    align-items: center;
-                    width: 20px;
-                    height: 20px;
-                    border-radius: 50%;
-                    font-size: 12px;
-                }
-                .rank-up {
-                    background-color: #00d68f;
-                    color: white;
-                }
-                .rank-down {
-                    background-color: #ff3d71;
-                    color: white;
-                }
-                .rank-same {
-                    background-color: #8f9bb3;
-                    color: white;
-                }
-                </style>
-            """, unsafe_allow_html=True)
+            # Per-entry form HTML is cached so reruns of either standings tab don't rebuild it
+            team_names = {entry_id: fpl_team.team_name for entry_id, fpl_team in fpl_team_map.items()}
+            team_form = _build_league_form(league_json.get('matches', []), team_names)
             
             html_rows = []
             
@@ -597,45 +562,13 @@ def render_standings_page(data, fixtures):
                 score_diff = score_for - score_against
                 
                 # Determine rank movement
-                if last_rank > rank:
-                    rank_icon = '<span class="rank-icon rank-up">▲</span>'
-                elif last_rank < rank:
-                    rank_icon = '<span class="rank-icon rank-down">▼</span>'
-                else:
-                    rank_icon = '<span class="rank-icon rank-same">●</span>'
+                rank_icon = RANK_ICONS[int(np.sign(last_rank - rank))]
                 
                 rank_html = f'<div class="rank-container">{rank}{rank_icon}</div>'
                 
-                # Build form HTML
-                form_items = []
-                entry_form = team_form.get(entry_id, [])
-                # Get last 5
-                recent_form = entry_form[-5:]
+                # Form HTML is prebuilt from the last 5 results
+                form_html = team_form.get(entry_id) or _form_html(())
                 
-                for i, match in enumerate(recent_form):
-                    res = match['result']
-                    score = match['score']
-                    opp_id = match['opponent']
-                    opp_name = fpl_team_map[opp_id].team_name if opp_id in fpl_team_map else "Unknown"
-                    gw = match['event']
-                    
-                    # Determine icon
-                    if res == 'W':
-                        icon = "✓"
-                    elif res == 'D':
-                        icon = "-"
-                    else:
-                        icon = "✕"
-                    
-                    # Check if it's the most recent (last in the list)
-                    is_recent = (i == len(recent_form) - 1)
-                    recent_class = " form-recent" if is_recent else ""
-                    
-                    tooltip = f"GW{gw}: {res} {score} vs {opp_name}"
-                    form_items.append(f'<div class="form-char form-{res}{recent_class}" data-tooltip="{tooltip}">{icon}</div>')
-                
-                form_html = f'<div class="form-container">{"".join(form_items)}</div>'
-                    
                 row_html = f"""<tr>
             <td>{rank_html}</td>
             <td>{fpl_team.team_name} ({fpl_team.manager_name})</td>
@@ -670,89 +603,7 @@ def render_standings_page(data, fixtures):
         if not teams or not fixtures:
             st.warning("No data available.")
         else:
-            league_table = calculate_league_table(teams, fixtures)
-            
-            # Build HTML table like FPL standings
-            epl_html_rows = []
-            
-            for _, row in league_table.iterrows():
-                # Build form HTML with circular icons and tooltips
-                form_items = []
-                form_details = row['FormDetails'][-5:]  # Get last 5 detailed results
-                
-                for i, match in enumerate(form_details):
-                    res = match['result']
-                    opponent = match['opponent']
-                    score = match['score']
-                    gw = match['gw']
-                    venue = 'H' if match['home'] else 'A'
-                    
-                    # Determine icon
-                    if res == 'W':
-                        icon = "✓"
-                    elif res == 'D':
-                        icon = "-"
-                    else:
-                        icon = "✕"
-                    
-                    # Check if most recent
-                    is_recent = (i == len(form_details) - 1)
-                    recent_class = " form-recent" if is_recent else ""
-                    
-                    tooltip = f"GW{gw}: {res} {score} vs {opponent} ({venue})"
-                    form_items.append(f'<div class="form-char form-{res}{recent_class}" data-tooltip="{tooltip}">{icon}</div>')
-                
-                form_html = f'<div class="form-container">{"".join(form_items)}</div>'
-                
-                # Calculate rank movement
-                pos = row['Pos']
-                prev_pos = row['PrevPos']
-                if prev_pos > pos:
-                    rank_icon = '<span class="rank-icon rank-up">▲</span>'
-                elif prev_pos < pos:
-                    rank_icon = '<span class="rank-icon rank-down">▼</span>'
-                else:
-                    rank_icon = '<span class="rank-icon rank-same">●</span>'
-                
-                rank_html = f'<div class="rank-container">{pos}{rank_icon}</div>'
-                
-                row_html = f"""<tr>
-            <td>{rank_html}</td>
-            <td><img src="{row['Logo']}" width="24" style="vertical-align: middle; margin-right: 8px;">{row['Team']}</td>
-            <td>{row['P']}</td>
-            <td>{row['W']}</td>
-            <td>{row['D']}</td>
-            <td>{row['L']}</td>
-            <td>{row['GF']}</td>
-            <td>{row['GA']}</td>
-            <td>{row['GD']}</td>
-            <td><strong>{row['Pts']}</strong></td>
-            <td>{form_html}</td>
-        </tr>"""
-                epl_html_rows.append(row_html)
-            
-            epl_table_html = f"""<table class="standings-table">
-            <thead>
-                <tr>
-                    <th>Pos</th>
-                    <th>Team</th>
-                    <th>P</th>
-                    <th>W</th>
-                    <th>D</th>
-                    <th>L</th>
-                    <th>GF</th>
-                    <th>GA</th>
-                    <th>GD</th>
-                    <th>Pts</th>
-                    <th>Form</th>
-                </tr>
-            </thead>
-            <tbody>
-                {"".join(epl_html_rows)}
-            </tbody>
-        </table>"""
-            
-            st.markdown(epl_table_html, unsafe_allow_html=True)
+            st.markdown(_render_epl_table_html(teams, fixtures), unsafe_allow_html=True)
 
 if __name__ == "__main__":
     main()
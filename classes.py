@@ -1,3 +1,8 @@
+from functools import cached_property
+from operator import attrgetter
+
+import numpy as np
+
 class LivePlayerData:
     def __init__(self, id, points, goals, assists, minutes, yellow_cards=0, red_cards=0, bonus=0):
         self.id = id
@@ -20,6 +25,11 @@ class Player:
         self.element_type = element_type
         self.code = code
 
+    @cached_property
+    def short_name(self):
+        """Pitch label: surname only for names longer than 10 characters."""
+        return self.name.split()[-1] if len(self.name) > 10 else self.name
+
     def __repr__(self):
         return f"Player(id={self.id}, name='{self.name}', club_id='{self.club_id}', element_type='{self.element_type}', code='{self.code}')"
 
@@ -31,6 +41,24 @@ class FplTeam:
         self.team_name = team_name
         self.players = players if players is not None else []
 
+    # Derived from players once it has been populated; players is not reassigned afterwards
+    @cached_property
+    def starting_xi(self):
+        return self.players[:11]
+
+    @cached_property
+    def xi_sorted(self):
+        """Starting XI ordered forwards first, goalkeeper last (display order)."""
+        return sorted(self.starting_xi, key=attrgetter('element_type'), reverse=True)
+
+    @cached_property
+    def bench(self):
+        return self.players[11:]
+
+    @cached_property
+    def xi_ids(self):
+        return np.fromiter((p.id for p in self.starting_xi), dtype=np.int64, count=len(self.starting_xi))
+
     def __repr__(self):
         return f"FplTeam(id={self.id}, entry_id={self.entry_id}, manager_name='{self.manager_name}', team_name='{self.team_name}', players={self.players})"
 
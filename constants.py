@@ -3,4 +3,5 @@ LEAGUE_ID = 70016
 BASE_URL = "https://draft.premierleague.com/api/"
 GAME_URL = BASE_URL + "game"
 LEAGUE_URL = BASE_URL + f"league/{LEAGUE_ID}/details"
-BOOTSTRAP_URL = BASE_URL + "bootstrap-static"
\ No newline at end of file
+BOOTSTRAP_URL = BASE_URL + "bootstrap-static"
+FIXTURES_URL = "https://fantasy.premierleague.com/api/fixtures/"
@@ -2,23 +2,19 @@
 Shared data loading module for FPL Streamlit app.
 Centralizes API calls and caches data to avoid redundant requests across pages.
 """
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import streamlit as st
 from typing import Dict, Any
 from classes import Club, ElementType, FplTeam, LivePlayerData, Player
 from http_helpers import get_bootstrap_json, get_current_gameweek, get_league_json, get_live_data, get_team_players
-from utils import create_fpl_team_map
+from utils import build_club_player_index, create_fpl_team_map
 
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
-def _fetch_bootstrap_data():
-    """Fetch and cache bootstrap data from FPL API."""
-    return get_bootstrap_json()
-
-
-@st.cache_data(ttl=300)
-def _fetch_league_data():
-    """Fetch and cache league data from FPL API."""
-    return get_league_json()
+# Live polling interval bounds in seconds: back off while live stats are unchanged, reset on any change
+LIVE_POLL_MIN_INTERVAL = 60  # Matches the live data cache TTL
+LIVE_POLL_MAX_INTERVAL = 300
 
 
 @st.cache_data(ttl=60)  # Cache for 1 minute (live data changes frequently)
@@ -27,97 +23,189 @@ def _fetch_live_data(gameweek: int):
     return get_live_data(gameweek)
 
 
-@st.cache_data(ttl=300)
-def _fetch_current_gameweek():
-    """Fetch and cache current gameweek."""
-    return get_current_gameweek()
+def _build_live_data(live_json, all_players_map, fpl_team_map) -> Dict[str, Any]:
+    """Build the live-stat structures derived from a gameweek's live JSON."""
+    live_players = live_json.get('elements', {})
+    live_player_data_map = {}
+    for i, element in live_players.items():
+        stats = element.get('stats', {})
+        live_player_data_map[int(i)] = LivePlayerData(
+            i,
+            stats.get('total_points', 0),
+            stats.get('goals_scored', 0),
+            stats.get('assists', 0),
+            stats.get('minutes', 0),
+            stats.get('yellow_cards', 0),
+            stats.get('red_cards', 0),
+            stats.get('bonus', 0)
+        )
+    
+    # Index starting XI players with live data by club (used by the fixtures tab)
+    club_to_fpl_players = build_club_player_index(fpl_team_map, live_player_data_map)
+    
+    # Structure-of-arrays view of live stats, indexed directly by player id
+    array_size = max(max(live_player_data_map, default=0), max(all_players_map, default=0)) + 1
+    live_player_arrays = {
+        field: np.zeros(array_size, dtype=np.int32)
+        for field in ('points', 'goals', 'assists', 'minutes', 'element_type')
+    }
+    live_ids = np.fromiter(live_player_data_map, dtype=np.intp, count=len(live_player_data_map))
+    live_rows = live_player_data_map.values()
+    live_player_arrays['points'][live_ids] = [d.points for d in live_rows]
+    live_player_arrays['goals'][live_ids] = [d.goals for d in live_rows]
+    live_player_arrays['assists'][live_ids] = [d.assists for d in live_rows]
+    live_player_arrays['minutes'][live_ids] = [d.minutes for d in live_rows]
+    player_ids = np.fromiter(all_players_map, dtype=np.intp, count=len(all_players_map))
+    live_player_arrays['element_type'][player_ids] = [p.element_type for p in all_players_map.values()]
+    
+    return {
+        'live_json': live_json,
+        'live_player_data_map': live_player_data_map,
+        'live_player_arrays': live_player_arrays,
+        'club_to_fpl_players': club_to_fpl_players,
+    }
+
+
+# The only cache for the bootstrap, league and gameweek payloads: they are fetched directly inside it,
+# so its 300s TTL bounds their staleness (only live data is cached separately, for 60s)
+@st.cache_resource(ttl=300, show_spinner="Loading FPL data...")
+def _load_shared_data() -> Dict[str, Any]:
+    """
+    Load the data that is identical for every session: bootstrap, league and team picks.
+    Cached as a resource so all sessions share the same objects; callers must not mutate it.
+    
+    Returns:
+        Dictionary containing the non-live data structures.
+    """
+    # Fetch basic data concurrently; the workers make plain HTTP calls and touch no Streamlit state,
+    # so they need no script context (this resource cache already caches the results)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        gameweek_future = executor.submit(get_current_gameweek)
+        bootstrap_future = executor.submit(get_bootstrap_json)
+        league_future = executor.submit(get_league_json)
+        current_gameweek = gameweek_future.result()
+        bootstrap_json = bootstrap_future.result()
+        league_json = league_future.result()
+    
+    # Process bootstrap data
+    element_types_map = {
+        pos.get('id'): ElementType(pos.get('id'), pos.get('singular_name_short')) 
+        for pos in bootstrap_json.get('element_types', [])
+    }
+    
+    # Flat position-name lookup indexed directly by element_type
+    position_names = [None] * (max(element_types_map, default=0) + 1)
+    for element_type, position in element_types_map.items():
+        position_names[element_type] = position.position_name
+    
+    all_clubs_map = {
+        team.get('id'): Club(team.get('id'), team.get('name')) 
+        for team in bootstrap_json.get('teams', [])
+    }
+    
+    all_players_map = {
+        player.get('id'): Player(
+            player.get('id'), 
+            player.get('team'), 
+            player.get('web_name'), 
+            player.get('element_type'),
+            player.get('code')
+        ) 
+        for player in bootstrap_json.get('elements', [])
+    }
+    
+    # Precompute club badge URLs once so pages don't rebuild them per render
+    teams = bootstrap_json.get('teams', [])
+    for team in teams:
+        team['badge_url'] = f"https://resources.premierleague.com/premierleague/badges/50/t{team['code']}.png"
+    team_map = {team['id']: team for team in teams}
+    
+    # Process league data
+    league_teams = league_json.get('league_entries', [])
+    fpl_team_map = create_fpl_team_map(league_teams)
+    
+    # Fetch players for each FPL team concurrently (one request per team, bounded by the session's pool size)
+    if fpl_team_map:
+        with ThreadPoolExecutor(max_workers=min(8, len(fpl_team_map))) as executor:
+            player_futures = {
+                team: executor.submit(get_team_players, team.entry_id, current_gameweek, all_players_map)
+                for team in fpl_team_map.values()
+            }
+            for team, future in player_futures.items():
+                team.players = future.result()
+    
+    return {
+        'current_gameweek': current_gameweek,
+        'bootstrap_json': bootstrap_json,
+        'league_json': league_json,
+        'element_types_map': element_types_map,
+        'position_names': position_names,
+        'all_clubs_map': all_clubs_map,
+        'all_players_map': all_players_map,
+        'fpl_team_map': fpl_team_map,
+        # Also include raw team and fixture data for landing page
+        'teams': teams,
+        'team_map': team_map,
+    }
 
 
 def load_all_data() -> Dict[str, Any]:
     """
     Load all necessary data for the FPL app.
-    Uses session state to ensure data is only loaded once per session.
+    Shared data is cached across sessions; the live-stat layer on top of it is
+    built once per session and rebuilt only when the shared data is reloaded.
     
     Returns:
         Dictionary containing all loaded data structures.
     """
-    # Initialize session state if not already done
-    if 'data_loaded' not in st.session_state:
-        st.session_state.data_loaded = False
+    shared_data = _load_shared_data()
     
-    # Return cached data if already loaded
-    if st.session_state.data_loaded and 'app_data' in st.session_state:
+    # Return this session's data if it was built from the current shared data
+    if st.session_state.get('shared_data') is shared_data and 'app_data' in st.session_state:
         return st.session_state.app_data
     
-    # Load all data
-    with st.spinner("Loading FPL data..."):
-        # Fetch basic data
-        current_gameweek = _fetch_current_gameweek()
-        bootstrap_json = _fetch_bootstrap_data()
-        league_json = _fetch_league_data()
-        live_json = _fetch_live_data(current_gameweek)
-        
-        # Process bootstrap data
-        element_types_map = {
-            pos.get('id'): ElementType(pos.get('id'), pos.get('singular_name_short')) 
-            for pos in bootstrap_json.get('element_types', [])
-        }
-        
-        all_clubs_map = {
-            team.get('id'): Club(team.get('id'), team.get('name')) 
-            for team in bootstrap_json.get('teams', [])
-        }
-        
-        all_players_map = {
-            player.get('id'): Player(
-                player.get('id'), 
-                player.get('team'), 
-                player.get('web_name'), 
-                player.get('element_type'),
-                player.get('code')
-            ) 
-            for player in bootstrap_json.get('elements', [])
-        }
-        
-        # Process league data
-        league_teams = league_json.get('league_entries', [])
-        fpl_team_map = create_fpl_team_map(league_teams)
-        
-        # Fetch players for each FPL team
-        for _, team in fpl_team_map.items():
-            team.players = get_team_players(team.entry_id, current_gameweek, all_players_map)
-        
-        # Process live data
-        live_players = live_json.get('elements', [])
-        live_player_data_map = {
-            int(i): LivePlayerData(
-                i,
-                live_players[i].get('stats', {}).get('total_points', 0),
-                live_players[i].get('stats', {}).get('goals_scored', 0),
-                live_players[i].get('stats', {}).get('assists', 0),
-                live_players[i].get('stats', {}).get('minutes', 0),
-                live_players[i].get('stats', {}).get('yellow_cards', 0),
-                live_players[i].get('stats', {}).get('red_cards', 0),
-                live_players[i].get('stats', {}).get('bonus', 0)
-            ) 
-            for i in live_players
-        }
-        
-        # Store in session state
-        st.session_state.app_data = {
-            'current_gameweek': current_gameweek,
-            'bootstrap_json': bootstrap_json,
-            'league_json': league_json,
-            'live_json': live_json,
-            'element_types_map': element_types_map,
-            'all_clubs_map': all_clubs_map,
-            'all_players_map': all_players_map,
-            'fpl_team_map': fpl_team_map,
-            'live_player_data_map': live_player_data_map,
-            # Also include raw team and fixture data for landing page
-            'teams': bootstrap_json.get('teams', []),
-        }
-        
-        st.session_state.data_loaded = True
-        
+    live_json = _fetch_live_data(shared_data['current_gameweek'])
+    
+    # Store in session state
+    st.session_state.app_data = {
+        **shared_data,
+        **_build_live_data(live_json, shared_data['all_players_map'], shared_data['fpl_team_map']),
+    }
+    st.session_state.shared_data = shared_data
+    st.session_state.live_poll = {'interval': LIVE_POLL_MIN_INTERVAL, 'next_poll': time.monotonic() + LIVE_POLL_MIN_INTERVAL}
+    
     return st.session_state.app_data
+
+
+def clear_live_data_cache():
+    """Drop the cached live JSON and polling backoff so the next refresh fetches it from the API."""
+    _fetch_live_data.clear()
+    st.session_state.pop('live_poll', None)
+
+
+def refresh_live_data() -> Dict[str, Any]:
+    """
+    Refresh the live-stat structures in the session's app data.
+    Only the live JSON is re-fetched (subject to its own 1 minute cache); bootstrap,
+    league and team picks are reused from the initial load. Polling backs off while
+    the live JSON is unchanged and resets to the minimum interval once it changes.
+    
+    Returns:
+        The session's app data dictionary with up-to-date live data.
+    """
+    app_data = load_all_data()
+    
+    poll = st.session_state.setdefault('live_poll', {'interval': LIVE_POLL_MIN_INTERVAL, 'next_poll': 0.0})
+    now = time.monotonic()
+    if now < poll['next_poll']:
+        return app_data
+    
+    live_json = _fetch_live_data(app_data['current_gameweek'])
+    if live_json != app_data['live_json']:
+        app_data.update(_build_live_data(live_json, app_data['all_players_map'], app_data['fpl_team_map']))
+        poll['interval'] = LIVE_POLL_MIN_INTERVAL
+    else:
+        poll['interval'] = min(poll['interval'] * 2, LIVE_POLL_MAX_INTERVAL)
+    poll['next_poll'] = now + poll['interval']
+    
+    return app_data
@@ -1,51 +1,41 @@
+import numpy as np
 import plotly.graph_objects as go
 import streamlit as st
+from functools import lru_cache
 from typing import List
 from classes import Player, LivePlayerData
 
 def get_player_positions(players: List[Player], field_height: float = 10, field_width: float = 7) -> dict:
     """Calculate x, y positions for each player on the field."""
-    positions = {}
-    
-    # Group players by position
-    gk = [p for p in players if p.element_type == 1]
-    defenders = [p for p in players if p.element_type == 2]
-    midfielders = [p for p in players if p.element_type == 3]
-    forwards = [p for p in players if p.element_type == 4]
+    signature = tuple((p.id, p.element_type) for p in players)
+    return _positions_for(signature, field_height, field_width)
+
+@lru_cache(maxsize=256)
+def _positions_for(signature: tuple, field_height: float, field_width: float) -> dict:
+    """Layout for an ordered (player id, element type) signature; the result is shared, so treat it as read-only."""
+    # Group players by position in a single pass (other element types are not drawn)
+    groups = {1: [], 2: [], 3: [], 4: []}
+    for player_id, element_type in signature:
+        if element_type in groups:
+            groups[element_type].append(player_id)
     
     # Y positions (vertical) - from bottom to top
-    gk_y = 0.5
-    def_y = 2.5
-    mid_y = 5.5
-    fwd_y = 8.5
-    
-    # Position goalkeepers
-    for i, player in enumerate(gk):
-        positions[player.id] = (field_width / 2, gk_y)
+    line_y = {1: 0.5, 2: 2.5, 3: 5.5, 4: 8.5}
     
-    # Position defenders
-    def_count = len(defenders)
-    if def_count > 0:
-        spacing = field_width / (def_count + 1)
-        for i, player in enumerate(defenders):
-            x = spacing * (i + 1)
-            positions[player.id] = (x, def_y)
+    positions = {}
     
-    # Position midfielders
-    mid_count = len(midfielders)
-    if mid_count > 0:
-        spacing = field_width / (mid_count + 1)
-        for i, player in enumerate(midfielders):
-            x = spacing * (i + 1)
-            positions[player.id] = (x, mid_y)
+    # Position goalkeepers
+    for player_id in groups[1]:
+        positions[player_id] = (field_width / 2, line_y[1])
     
-    # Position forwards
-    fwd_count = len(forwards)
-    if fwd_count > 0:
-        spacing = field_width / (fwd_count + 1)
-        for i, player in enumerate(forwards):
-            x = spacing * (i + 1)
-            positions[player.id] = (x, fwd_y)
+    # Position defenders, midfielders and forwards evenly across the width of their line
+    for element_type in (2, 3, 4):
+        player_ids = groups[element_type]
+        if player_ids:
+            spacing = field_width / (len(player_ids) + 1)
+            xs = (np.arange(1, len(player_ids) + 1) * spacing).tolist()
+            for player_id, x in zip(player_ids, xs):
+                positions[player_id] = (x, line_y[element_type])
     
     return positions
 
@@ -67,73 +57,126 @@ def get_performance_color(is_finished: bool, is_started: bool) -> str:
         return '#94a3b8'  # Light Grey - Not Started
 
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from http_helpers import SESSION, SESSION_POOL_MAXSIZE
 
-@st.cache_data(ttl=3600)  # Cache image checks for 1 hour
-def get_player_image_url(code: int) -> str:
-    """Get valid player image URL or fallback to placeholder."""
-    url = f"https://resources.premierleague.com/premierleague/photos/players/110x140/p{code}.png"
+PLAYER_PHOTO_URL = "https://resources.premierleague.com/premierleague/photos/players/110x140/p{code}.png"
+MISSING_PHOTO_URL = "https://resources.premierleague.com/premierleague/photos/players/110x140/Photo-Missing.png"
+
+def _player_photo_exists(code: int) -> bool:
+    """HEAD-probe a single player photo on the Premier League CDN."""
     try:
-        response = requests.head(url, timeout=1)
-        if response.status_code == 200:
-            return url
-    except:
-        pass
-    return "https://resources.premierleague.com/premierleague/photos/players/110x140/Photo-Missing.png"
+        return SESSION.head(PLAYER_PHOTO_URL.format(code=code), timeout=2).status_code == 200
+    except requests.RequestException:
+        return False
+
+@st.cache_data(ttl=86400, show_spinner=False)  # Photos rarely change, so check them once a day
+def get_available_photo_codes(codes: tuple) -> frozenset:
+    """Return the subset of player codes whose photo exists, probing all of them concurrently."""
+    if not codes:
+        return frozenset()
+    # Stay within the shared session's pool so every probe reuses a kept-alive, retrying connection
+    with ThreadPoolExecutor(max_workers=min(SESSION_POOL_MAXSIZE, len(codes))) as executor:
+        exists = list(executor.map(_player_photo_exists, codes))
+    return frozenset(code for code, found in zip(codes, exists) if found)
+
+def get_player_image_url(code: int, available_photo_codes: frozenset) -> str:
+    """Get valid player image URL or fallback to placeholder."""
+    return PLAYER_PHOTO_URL.format(code=code) if code in available_photo_codes else MISSING_PHOTO_URL
+
+def _build_field_shapes(field_height: float = 10, field_width: float = 7) -> list:
+    """Build the static pitch markings (background, halfway line, centre circle, boxes) as layout shapes."""
+    line = dict(color="white", width=2)
+    shapes = [
+        # Draw Field (Green Background)
+        dict(type="rect", x0=0, y0=0, x1=field_width, y1=field_height,
+             line=line, fillcolor="#2d5016", layer="below"),
+        # Center Line
+        dict(type="line", x0=0, y0=field_height/2, x1=field_width, y1=field_height/2, line=line),
+        # Center Circle
+        dict(type="circle",
+             x0=field_width/2 - 0.8, y0=field_height/2 - 0.8,
+             x1=field_width/2 + 0.8, y1=field_height/2 + 0.8,
+             line=line),
+    ]
+    
+    # Penalty Areas
+    for y_base, direction in [(0, 1), (field_height, -1)]:
+        # Penalty Box
+        shapes.append(dict(type="rect",
+            x0=field_width/2 - 2, y0=y_base,
+            x1=field_width/2 + 2, y1=y_base + (1.5 * direction),
+            line=line))
+        # Goal Box
+        shapes.append(dict(type="rect",
+            x0=field_width/2 - 1, y0=y_base,
+            x1=field_width/2 + 1, y1=y_base + (0.6 * direction),
+            line=line))
+    
+    return shapes
+
+def _build_field_layout(field_height: float = 10, field_width: float = 7) -> dict:
+    """Build the team-independent layout: pitch shapes, hidden axes, colours, size and legend placement."""
+    return dict(
+        shapes=_build_field_shapes(field_height, field_width),
+        xaxis=dict(range=[-0.5, field_width + 0.5], showgrid=False, zeroline=False, visible=False),
+        yaxis=dict(range=[-1.0, field_height + 0.5], showgrid=False, zeroline=False, visible=False),
+        plot_bgcolor='#1e293b',
+        paper_bgcolor='#1e293b',
+        width=500,
+        height=800, # Increased height to accommodate icons
+        margin=dict(l=10, r=10, t=40, b=100), # Increased bottom margin
+        legend=dict(
+            orientation="h",
+            yanchor="top",
+            y=-0.02, # Position below the chart
+            xanchor="center",
+            x=0.5,
+            font=dict(color="white")
+        ),
+        dragmode=False
+    )
+
+# Legend for Colors (placeholder traces that only appear in the legend)
+_LEGEND_TRACES = [
+    dict(type='scatter', x=[None], y=[None], mode='markers', marker=dict(size=10, color=color), name=label, showlegend=True)
+    for label, color in (
+        ("Completed", "#22c55e"),
+        ("Live/Pending", "#eab308"),
+        ("Not Played", "#94a3b8")
+    )
+]
+
+# The pitch never changes, so its layout is built once instead of per rendered team
+_FIELD_LAYOUT = _build_field_layout()
 
 def render_soccer_field(team_xi: List[Player], live_player_data_map: dict, 
                        element_types_map: dict, team_name: str = "", 
-                       club_fixture_status_map: dict = None, bench: List[Player] = None):
+                       club_fixture_status_map: dict = None, bench: List[Player] = None,
+                       available_photo_codes: frozenset = None):
     """Render a soccer field with players positioned on it using Plotly.
     
     Args:
         club_fixture_status_map: Dict mapping club_id to fixture status dict with 'finished' and 'started' booleans
+        available_photo_codes: Player codes with a photo on the CDN (see get_available_photo_codes); probed for this XI if omitted
     """
     
     field_height = 10
     field_width = 7
     
-    fig = go.Figure()
-    
-    # Draw Field (Green Background)
-    fig.add_shape(type="rect",
-        x0=0, y0=0, x1=field_width, y1=field_height,
-        line=dict(color="white", width=2),
-        fillcolor="#2d5016",
-        layer="below"
-    )
-    
-    # Center Line
-    fig.add_shape(type="line",
-        x0=0, y0=field_height/2, x1=field_width, y1=field_height/2,
-        line=dict(color="white", width=2)
-    )
-    
-    # Center Circle
-    fig.add_shape(type="circle",
-        x0=field_width/2 - 0.8, y0=field_height/2 - 0.8,
-        x1=field_width/2 + 0.8, y1=field_height/2 + 0.8,
-        line=dict(color="white", width=2)
-    )
-    
-    # Penalty Areas
-    for y_base, direction in [(0, 1), (field_height, -1)]:
-        # Penalty Box
-        fig.add_shape(type="rect",
-            x0=field_width/2 - 2, y0=y_base,
-            x1=field_width/2 + 2, y1=y_base + (1.5 * direction),
-            line=dict(color="white", width=2)
-        )
-        # Goal Box
-        fig.add_shape(type="rect",
-            x0=field_width/2 - 1, y0=y_base,
-            x1=field_width/2 + 1, y1=y_base + (0.6 * direction),
-            line=dict(color="white", width=2)
-        )
-    
     # Get positions
     positions = get_player_positions(team_xi, field_height, field_width)
     
-    # Add Players
+    if available_photo_codes is None:
+        available_photo_codes = get_available_photo_codes(tuple(sorted(p.code for p in team_xi)))
+    
+    # Collect per-player values, then draw each layer as a single trace
+    images = []
+    hover_x, hover_y, hover_texts = [], [], []
+    badge_x, badge_y, badge_colors, badge_texts = [], [], [], []
+    name_x, name_y, name_texts = [], [], []
+    icon_x, icon_y, icon_texts = [], [], []
+    
     for player in team_xi:
         if player.id not in positions:
             continue
@@ -159,8 +202,8 @@ def render_soccer_field(team_xi: List[Player], live_player_data_map: dict,
         
         # Player Image
         if hasattr(player, 'code'):
-            image_url = get_player_image_url(player.code)
-            fig.add_layout_image(
+            image_url = get_player_image_url(player.code, available_photo_codes)
+            images.append(
                 dict(
                     source=image_url,
                     x=x,
@@ -189,116 +232,75 @@ def render_soccer_field(team_xi: List[Player], live_player_data_map: dict,
             hover_text += f"<br>Red Cards: {red_cards}"
         if bonus > 0:
             hover_text += f"<br>Bonus: {bonus}"
+        hover_x.append(x)
+        hover_y.append(y)
+        hover_texts.append(hover_text)
+        
+        # Points Badge (Circle with number) - top right
+        badge_x.append(x + 0.45)
+        badge_y.append(y + 0.45)
+        badge_colors.append(color)
+        badge_texts.append(str(points))
         
-        fig.add_trace(go.Scatter(
-            x=[x], y=[y],
+        # Name Label
+        name_x.append(x)
+        name_y.append(y - 0.75)
+        name_texts.append(player.short_name)
+        
+        # Icons row below player name - goals (capped at 3), assists (capped at 3), cards, centred under the player
+        icons = ['⚽'] * min(goals, 3) + ['👟'] * min(assists, 3) + ['🟨'] * yellow_cards + ['🟥'] * red_cards
+        if icons:
+            icon_spacing = 0.28
+            icon_x_start = x - ((len(icons) - 1) * icon_spacing / 2)
+            icon_x.extend(icon_x_start + (icon_idx * icon_spacing) for icon_idx in range(len(icons)))
+            icon_y.extend([y - 1.1] * len(icons))
+            icon_texts.extend(icons)
+    
+    traces = [
+        dict(
+            type='scatter',
+            x=hover_x, y=hover_y,
             mode='markers',
             marker=dict(size=40, color='rgba(0,0,0,0)'), # Invisible marker covering the image
             hoverinfo='text',
-            hovertext=hover_text,
+            hovertext=hover_texts,
             showlegend=False
-        ))
-        
-        # Points Badge (Circle with number) - top right
-        fig.add_trace(go.Scatter(
-            x=[x + 0.45], y=[y + 0.45],
+        ),
+        dict(
+            type='scatter',
+            x=badge_x, y=badge_y,
             mode='markers+text',
-            marker=dict(size=24, color=color, line=dict(color='white', width=1)),
-            text=[str(points)],
+            marker=dict(size=24, color=badge_colors, line=dict(color='white', width=1)),
+            text=badge_texts,
             textfont=dict(color='white', size=11, family="Arial Black"),
             hoverinfo='skip',
             showlegend=False
-        ))
-        
-        # Name Label
-        display_name = player.name.split()[-1] if len(player.name) > 10 else player.name
-        fig.add_trace(go.Scatter(
-            x=[x], y=[y - 0.75],
+        ),
+        dict(
+            type='scatter',
+            x=name_x, y=name_y,
             mode='text',
-            text=[display_name],
+            text=name_texts,
             textfont=dict(color='white', size=10, family="Arial"),
             textposition="bottom center",
             hoverinfo='skip',
             showlegend=False
-        ))
-        
-        # Icons row below player name - goals, assists, cards
-        # Calculate total icons to center them
-        total_icons = min(goals, 3) + min(assists, 3) + yellow_cards + red_cards
-        if total_icons > 0:
-            icon_y = y - 1.1
-            icon_spacing = 0.28
-            # Center the icons
-            total_width = (total_icons - 1) * icon_spacing
-            icon_x_start = x - (total_width / 2)
-            icon_idx = 0
-            
-            # Goal icons (soccer balls) - ⚽
-            for g in range(min(goals, 3)):  # Cap at 3 to avoid overflow
-                fig.add_trace(go.Scatter(
-                    x=[icon_x_start + (icon_idx * icon_spacing)], y=[icon_y],
-                    mode='text',
-                    text=['⚽'],
-                    textfont=dict(size=16),
-                    hoverinfo='skip',
-                    showlegend=False
-                ))
-                icon_idx += 1
-            
-            # Assist icons (boot) - 👟
-            for a in range(min(assists, 3)):  # Cap at 3
-                fig.add_trace(go.Scatter(
-                    x=[icon_x_start + (icon_idx * icon_spacing)], y=[icon_y],
-                    mode='text',
-                    text=['👟'],
-                    textfont=dict(size=16),
-                    hoverinfo='skip',
-                    showlegend=False
-                ))
-                icon_idx += 1
-            
-            # Yellow cards - 🟨
-            for yc in range(yellow_cards):
-                fig.add_trace(go.Scatter(
-                    x=[icon_x_start + (icon_idx * icon_spacing)], y=[icon_y],
-                    mode='text',
-                    text=['🟨'],
-                    textfont=dict(size=16),
-                    hoverinfo='skip',
-                    showlegend=False
-                ))
-                icon_idx += 1
-            
-            # Red cards - 🟥
-            for rc in range(red_cards):
-                fig.add_trace(go.Scatter(
-                    x=[icon_x_start + (icon_idx * icon_spacing)], y=[icon_y],
-                    mode='text',
-                    text=['🟥'],
-                    textfont=dict(size=16),
-                    hoverinfo='skip',
-                    showlegend=False
-                ))
-                icon_idx += 1
-
-    # Legend for Colors
-    legend_items = [
-        ("Completed", "#22c55e"),
-        ("Live/Pending", "#eab308"),
-        ("Not Played", "#94a3b8")
+        ),
     ]
-    
-    for i, (label, color) in enumerate(legend_items):
-        fig.add_trace(go.Scatter(
-            x=[None], y=[None],
-            mode='markers',
-            marker=dict(size=10, color=color),
-            name=label,
-            showlegend=True
+    if icon_texts:
+        traces.append(dict(
+            type='scatter',
+            x=icon_x, y=icon_y,
+            mode='text',
+            text=icon_texts,
+            textfont=dict(size=16),
+            hoverinfo='skip',
+            showlegend=False
         ))
-
-    # Layout Configuration
-    fig.update_layout(
+    
+    # Layout is the static template plus this team's title and photos
+    layout = dict(
+        _FIELD_LAYOUT,
         title=dict(
             text=team_name,
             y=0.98,
@@ -307,22 +309,7 @@ def render_soccer_field(team_xi: List[Player], live_player_data_map: dict,
             yanchor='top',
             font=dict(size=20, color='white')
         ),
-        xaxis=dict(range=[-0.5, field_width + 0.5], showgrid=False, zeroline=False, visible=False),
-        yaxis=dict(range=[-1.0, field_height + 0.5], showgrid=False, zeroline=False, visible=False),
-        plot_bgcolor='#1e293b',
-        paper_bgcolor='#1e293b',
-        width=500,
-        height=800, # Increased height to accommodate icons
-        margin=dict(l=10, r=10, t=40, b=100), # Increased bottom margin
-        legend=dict(
-            orientation="h",
-            yanchor="top",
-            y=-0.02, # Position below the chart
-            xanchor="center",
-            x=0.5,
-            font=dict(color="white")
-        ),
-        dragmode=False
+        images=images
     )
     
     # Add Bench if provided
@@ -350,20 +337,53 @@ def render_soccer_field(team_xi: List[Player], live_player_data_map: dict,
             
         bench_text = "<b>Bench:</b> " + ", ".join(bench_items)
         
-        fig.add_annotation(
+        layout['annotations'] = [dict(
             text=bench_text,
             xref="paper", yref="paper",
             x=0.5, y=-0.12, # Below the legend
             showarrow=False,
             font=dict(color="white", size=12),
             align="center"
-        )
+        )]
 
-    return fig
+    # Every trace and layout value above is a literal known to be valid, so skip Plotly's per-attribute schema validation.
+    # _validate is a private go.Figure kwarg (checked against plotly 7.1): re-check it exists when upgrading Plotly
+    return go.Figure(data=traces + _LEGEND_TRACES, layout=layout, _validate=False)
+
+def _field_signature(players: List[Player], live_player_data_map: dict, club_fixture_status_map: dict) -> tuple:
+    """Everything about a group of players that the field drawing depends on, as a hashable cache key."""
+    signature = []
+    for player in players:
+        live_data = live_player_data_map.get(player.id)
+        stats = (live_data.points, live_data.goals, live_data.assists, live_data.minutes,
+                 getattr(live_data, 'yellow_cards', 0), getattr(live_data, 'red_cards', 0), getattr(live_data, 'bonus', 0)) if live_data else None
+        status = (club_fixture_status_map or {}).get(player.club_id, {})
+        signature.append((player.id, stats, status.get('finished', False), status.get('started', False)))
+    return tuple(signature)
+
+# cache_resource hands back the same Figure instead of unpickling a copy, which would re-run validation on every hit;
+# st.plotly_chart only reads the figure, so sharing it is safe
+# Room for every team's current figure plus one superseded generation (~2x a draft league's 16 teams);
+# each live scoring change keys a new figure, so without a bound stale ones pile up until the TTL sweeps them
+FIELD_FIGURE_CACHE_ENTRIES = 32
+
+@st.cache_resource(ttl=60, max_entries=FIELD_FIGURE_CACHE_ENTRIES, show_spinner=False)  # Same cadence as the live data the figure is drawn from
+def _cached_field_figure(field_key: tuple, _team_xi: List[Player], _live_player_data_map: dict,
+                         _element_types_map: dict, team_name: str, _club_fixture_status_map: dict,
+                         _bench: List[Player], available_photo_codes: frozenset) -> go.Figure:
+    """Build the field figure once per field_key and reuse it across reruns and sessions."""
+    return render_soccer_field(_team_xi, _live_player_data_map, _element_types_map, team_name, _club_fixture_status_map,
+                               _bench, available_photo_codes)
 
 def display_field_in_streamlit(team_xi: List[Player], live_player_data_map: dict,
                                element_types_map: dict, team_name: str = "", 
-                               club_fixture_status_map: dict = None, bench: List[Player] = None):
+                               club_fixture_status_map: dict = None, bench: List[Player] = None,
+                               available_photo_codes: frozenset = None):
     """Helper function to display the field visualization in Streamlit."""
-    fig = render_soccer_field(team_xi, live_player_data_map, element_types_map, team_name, club_fixture_status_map, bench)
+    field_key = (
+        _field_signature(team_xi, live_player_data_map, club_fixture_status_map),
+        _field_signature(bench or [], live_player_data_map, club_fixture_status_map),
+    )
+    fig = _cached_field_figure(field_key, team_xi, live_player_data_map, element_types_map, team_name,
+                               club_fixture_status_map, bench, available_photo_codes)
     st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
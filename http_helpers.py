@@ -1,12 +1,57 @@
+import threading
 from typing import List
 
 from classes import Player
-from constants import BASE_URL, BOOTSTRAP_URL, GAME_URL, LEAGUE_URL
+from constants import BASE_URL, BOOTSTRAP_URL, FIXTURES_URL, GAME_URL, LEAGUE_URL
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Shared session so repeated API calls reuse the TCP/TLS connection; the pool is
+# sized for the concurrent fetches issued during data loading. Transient network
+# errors and 5xx responses are retried with a short backoff (0.3s, 0.6s, 1.2s)
+SESSION_POOL_MAXSIZE = 8  # Connections kept per host; concurrent callers should not use more workers than this
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=SESSION_POOL_MAXSIZE,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504), allowed_methods=("GET", "HEAD"), raise_on_status=False),
+))
+
+# Last fixtures payload and its validators, reused when the API answers 304 Not Modified. Kept here rather
+# than in Home.py because imported modules persist across reruns, while the main script starts fresh each run
+_last_fixtures = {'etag': None, 'last_modified': None, 'payload': None}
+_last_fixtures_lock = threading.Lock()
+
+def get_fixtures_json():
+    """Fetch all fixtures with a conditional GET, so unchanged fixtures come back as a bodiless 304."""
+    with _last_fixtures_lock:
+        etag, last_modified, last_payload = _last_fixtures['etag'], _last_fixtures['last_modified'], _last_fixtures['payload']
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    
+    fixtures_response = SESSION.get(FIXTURES_URL, headers=headers, timeout=5)
+    if fixtures_response.status_code == 304 and last_payload is not None:
+        return last_payload
+    if fixtures_response.status_code == 200:
+        fixtures_json = fixtures_response.json()
+    else:
+        raise Exception(f"Failed to fetch fixtures: {fixtures_response.status_code}")
+    
+    with _last_fixtures_lock:
+        _last_fixtures.update(
+            etag=fixtures_response.headers.get('ETag'),
+            last_modified=fixtures_response.headers.get('Last-Modified'),
+            payload=fixtures_json,
+        )
+    return fixtures_json
 
 def get_bootstrap_json():
-    bootstrap_response = requests.get(BOOTSTRAP_URL)
+    bootstrap_response = SESSION.get(BOOTSTRAP_URL)
     if bootstrap_response.status_code == 200:
         bootstrap_json = bootstrap_response.json()
     else:
@@ -14,7 +59,7 @@ def get_bootstrap_json():
     return bootstrap_json
 
 def get_league_json():
-    league_response = requests.get(LEAGUE_URL)
+    league_response = SESSION.get(LEAGUE_URL)
     if league_response.status_code == 200:
         league_json = league_response.json()
     else:
@@ -22,7 +67,7 @@ def get_league_json():
     return league_json
 
 def get_current_gameweek():
-    game_response = requests.get(GAME_URL)
+    game_response = SESSION.get(GAME_URL)
     if game_response.status_code == 200:
         game_json = game_response.json()
     else:
@@ -30,7 +75,7 @@ def get_current_gameweek():
     return game_json.get('current_event')
 
 def get_live_data(gameweek: int):
-    live_response = requests.get(f"{BASE_URL}event/{gameweek}/live")
+    live_response = SESSION.get(f"{BASE_URL}event/{gameweek}/live")
     if live_response.status_code == 200:
         live_json = live_response.json()
     else:
@@ -40,7 +85,7 @@ def get_live_data(gameweek: int):
 def get_team_players(team_id: int, gameweek: int, all_players_map: dict[int, Player]) -> List[Player]:
     """Fetch players for a specific team in a specific gameweek."""
     team_url = f"{BASE_URL}entry/{team_id}/event/{gameweek}"
-    response = requests.get(team_url)
+    response = SESSION.get(team_url)
     
     if response.status_code == 200:
         team_data = response.json()
@@ -0,0 +1,176 @@
+"""
+Static styling for the FPL Streamlit app: page CSS and standings icons.
+Kept out of Home.py (Streamlit's main script, re-executed on every run) so they are built once per process.
+"""
+
+# Standings icons, looked up by result and by the sign of the rank change (previous - current)
+FORM_ICONS = {'W': "✓", 'D': "-", 'L': "✕"}
+RANK_ICONS = {
+    1: '<span class="rank-icon rank-up">▲</span>',
+    -1: '<span class="rank-icon rank-down">▼</span>',
+    0: '<span class="rank-icon rank-same">●</span>',
+}
+
+# Page CSS, kept as module constants so reruns emit the same strings without rebuilding them
+NAV_CSS = """
+<style>
+[data-testid="stSidebar"] {
+    display: none;
+}
+[data-testid="stSidebarCollapsedControl"] {
+    display: none;
+}
+.top-nav {
+    position: fixed;
+    top: 0;
+    left: 0;
+    right: 0;
+    display: flex;
+    align-items: center;
+    gap: 24px;
+    padding: 12px 24px;
+    background: #0e1117;
+    border-bottom: 1px solid #333;
+    z-index: 999999;
+}
+.nav-link {
+    color: #a0a0a0 !important;
+    text-decoration: none !important;
+    font-size: 16px;
+    font-weight: 500;
+    padding: 8px 16px;
+    border-radius: 4px;
+    transition: all 0.2s;
+}
+.nav-link:hover {
+    color: #ffffff !important;
+    background: rgba(255,255,255,0.1);
+    text-decoration: none !important;
+}
+.nav-link.active {
+    color: #ffffff !important;
+    background: rgba(255,255,255,0.15);
+}
+/* Add padding to content to account for fixed nav */
+.main .block-container {
+    padding-top: 20px !important;
+}
+</style>
+"""
+
+STANDINGS_CSS = """
+<style>
+.standings-table {
+    width: 100%;
+    border-collapse: collapse;
+    font-family: sans-serif;
+    font-size: 0.9rem;
+}
+.standings-table th {
+    text-align: left;
+    padding: 8px;
+    border-bottom: 2px solid #333;
+    color: #888;
+    font-weight: 600;
+}
+.standings-table td {
+    padding: 8px;
+    border-bottom: 1px solid #333;
+    vertical-align: middle;
+}
+.standings-table tr:hover {
+    background-color: rgba(255, 255, 255, 0.05);
+}
+.form-container {
+    display: flex;
+    align-items: center;
+    gap: 4px;
+}
+.form-char {
+    display: flex;
+    justify-content: center;
+    align-items: center;
+    width: 24px;
+    height: 24px;
+    border-radius: 50%;
+    font-weight: bold;
+    color: white;
+    font-size: 14px;
+    cursor: default;
+    position: relative;
+}
+.form-W { background-color: #00b866; }
+.form-D { background-color: #888888; }
+.form-L { background-color: #d81b60; }
+
+/* Custom tooltip - faster than native */
+.form-char[data-tooltip] {
+    position: relative;
+}
+.form-char[data-tooltip]::before {
+    content: attr(data-tooltip);
+    position: absolute;
+    bottom: 100%;
+    left: 50%;
+    transform: translateX(-50%);
+    padding: 6px 10px;
+    background: rgba(0, 0, 0, 0.9);
+    color: white;
+    font-size: 11px;
+    white-space: nowrap;
+    border-radius: 4px;
+    opacity: 0;
+    pointer-events: none;
+    transition: opacity 0.15s ease-in-out;
+    z-index: 1000;
+    margin-bottom: 5px;
+}
+.form-char[data-tooltip]:hover::before {
+    opacity: 1;
+    transition-delay: 0s;
+}
+
+/* Accent for the most recent result */
+.form-recent::after {
+    content: '';
+    position: absolute;
+    top: -3px;
+    left: -3px;
+    right: -3px;
+    bottom: -3px;
+    border-radius: 50%;
+    border: 2px solid;
+}
+.form-recent.form-W::after { border-color: #00b866; }
+.form-recent.form-D::after { border-color: #888888; }
+.form-recent.form-L::after { border-color: #d81b60; }
+
+/* Rank movement icons */
+.rank-container {
+    display: flex;
+    align-items: center;
+    gap: 6px;
+}
+.rank-icon {
+    display: inline-flex;
+    justify-content: center;
+    align-items: center;
+    width: 20px;
+    height: 20px;
+    border-radius: 50%;
+    font-size: 12px;
+}
+.rank-up {
+    background-color: #00d68f;
+    color: white;
+}
+.rank-down {
+    background-color: #ff3d71;
+    color: white;
+}
+.rank-same {
+    background-color: #8f9bb3;
+    color: white;
+}
+</style>
+"""
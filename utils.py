@@ -1,3 +1,4 @@
+from collections import defaultdict
 from typing import List
 
 from classes import FplTeam
@@ -15,124 +16,128 @@ def create_fpl_team_map(league_entries: List[dict]) -> dict[int, FplTeam]:
         teams[id] = FplTeam(id, entry_id, manager_name, team_name)
     return teams
 
+def build_club_player_index(fpl_team_map: dict[int, FplTeam], live_player_data_map: dict) -> dict[int, list]:
+    """Create {club_id: [(fpl_team_id, player, live_data), ...]} for starting XI players with live data."""
+    index = defaultdict(list)
+    for fpl_team_id, fpl_team in fpl_team_map.items():
+        for player in fpl_team.starting_xi:
+            live_data = live_player_data_map.get(player.id)
+            if live_data is None:
+                continue
+            index[player.club_id].append((fpl_team_id, player, live_data))
+    return dict(index)
+
+import dateutil.tz
+import numpy as np
 import pandas as pd
 import random
+import streamlit as st
 from typing import List
 from classes import FplTeam, Player, Fixture
 
+# Local timezone for kickoff times, resolved once per process (this module is imported, not re-run like Home.py)
+LOCAL_TZ = dateutil.tz.tzlocal()
+
+# Goalkeeper and defender element types
+GK_DEF_TYPES = frozenset((1, 2))
+
+def _team_results(fixtures) -> pd.DataFrame:
+    """Build a long-format frame with one row per team per finished fixture."""
+    finished = [f for f in fixtures if f['finished_provisional']]
+    fix_df = pd.DataFrame({
+        'home_id': [f['team_h'] for f in finished],
+        'away_id': [f['team_a'] for f in finished],
+        'home_score': [f['team_h_score'] for f in finished],
+        'away_score': [f['team_a_score'] for f in finished],
+        'gw': [f.get('event', '') for f in finished],
+    })
+    
+    home_view = pd.DataFrame({
+        'team_id': fix_df['home_id'],
+        'opponent_id': fix_df['away_id'],
+        'gf': fix_df['home_score'],
+        'ga': fix_df['away_score'],
+        'gw': fix_df['gw'],
+        'home': True,
+    })
+    away_view = pd.DataFrame({
+        'team_id': fix_df['away_id'],
+        'opponent_id': fix_df['home_id'],
+        'gf': fix_df['away_score'],
+        'ga': fix_df['home_score'],
+        'gw': fix_df['gw'],
+        'home': False,
+    })
+    
+    # Interleave home/away rows so each team's results stay in fixture order
+    long = pd.concat([home_view, away_view]).sort_index(kind='stable').reset_index(drop=True)
+    
+    gf = long['gf'].to_numpy()
+    ga = long['ga'].to_numpy()
+    wins, draws = gf > ga, gf == ga
+    long['result'] = np.select([wins, draws], ['W', 'D'], 'L')
+    # Form icon encoded alongside the result so the Form string is a plain join
+    long['form_icon'] = np.select([wins, draws], ['✅', '➖'], '❌')
+    return long
+
+def _aggregate_results(team_idx: np.ndarray, gf: np.ndarray, ga: np.ndarray, n_teams: int) -> dict:
+    """Sum P/W/D/L/GF/GA/GD/Pts per team with np.bincount over dense team indices."""
+    def count(weights=None):
+        return np.bincount(team_idx, weights=weights, minlength=n_teams).astype(int)
+    
+    totals = {
+        'P': count(),
+        'W': count(gf > ga),
+        'D': count(gf == ga),
+        'L': count(gf < ga),
+        'GF': count(gf),
+        'GA': count(ga),
+    }
+    totals['GD'] = totals['GF'] - totals['GA']
+    totals['Pts'] = 3 * totals['W'] + totals['D']
+    return totals
+
+def _rank_positions(standings: pd.DataFrame) -> pd.Series:
+    """Return 1-based league positions ordered by Points, then GD, then GF."""
+    order = np.lexsort((-standings['GF'].to_numpy(), -standings['GD'].to_numpy(), -standings['Pts'].to_numpy()))
+    return pd.Series(np.arange(1, len(order) + 1), index=standings['team_id'].to_numpy()[order])
+
+@st.cache_data(ttl=60, show_spinner=False)  # Same lifetime as the cached fixtures it is built from
 def calculate_league_table(teams, fixtures):
     """Calculate the league table from fixtures."""
     # Create team name lookup
     team_names = {team['id']: team['name'] for team in teams}
     
-    # Initialize table dictionary
-    table = {team['id']: {
-        'Logo': f"https://resources.premierleague.com/premierleague/badges/50/t{team['code']}.png",
-        'Team': team['name'],
-        'P': 0,
-        'W': 0,
-        'D': 0,
-        'L': 0,
-        'GF': 0,
-        'GA': 0,
-        'GD': 0,
-        'Pts': 0,
-        'Form': [],  # Store last 5 results with details
-        'FormDetails': []  # Store detailed form data for tooltips
-    } for team in teams}
+    df = pd.DataFrame({
+        'team_id': [team['id'] for team in teams],
+        'Logo': [team['badge_url'] for team in teams],
+        'Team': [team['name'] for team in teams],
+    })
+    
+    long = _team_results(fixtures)
+    long['opponent'] = long['opponent_id'].map(team_names).fillna('Unknown')
+    long['score'] = long['gf'].astype(str) + '-' + long['ga'].astype(str)
     
-    for fixture in fixtures:
-        if fixture['finished_provisional']:
-            home_id = fixture['team_h']
-            away_id = fixture['team_a']
-            home_score = fixture['team_h_score']
-            away_score = fixture['team_a_score']
-            gameweek = fixture.get('event', '')
-            
-            # Update Home Team
-            table[home_id]['P'] += 1
-            table[home_id]['GF'] += home_score
-            table[home_id]['GA'] += away_score
-            table[home_id]['GD'] += (home_score - away_score)
-            
-            # Update Away Team
-            table[away_id]['P'] += 1
-            table[away_id]['GF'] += away_score
-            table[away_id]['GA'] += home_score
-            table[away_id]['GD'] += (away_score - home_score)
-            
-            if home_score > away_score:
-                table[home_id]['W'] += 1
-                table[home_id]['Pts'] += 3
-                table[home_id]['Form'].append('W')
-                table[home_id]['FormDetails'].append({
-                    'result': 'W',
-                    'opponent': team_names.get(away_id, 'Unknown'),
-                    'score': f"{home_score}-{away_score}",
-                    'gw': gameweek,
-                    'home': True
-                })
-                
-                table[away_id]['L'] += 1
-                table[away_id]['Form'].append('L')
-                table[away_id]['FormDetails'].append({
-                    'result': 'L',
-                    'opponent': team_names.get(home_id, 'Unknown'),
-                    'score': f"{away_score}-{home_score}",
-                    'gw': gameweek,
-                    'home': False
-                })
-            elif away_score > home_score:
-                table[away_id]['W'] += 1
-                table[away_id]['Pts'] += 3
-                table[away_id]['Form'].append('W')
-                table[away_id]['FormDetails'].append({
-                    'result': 'W',
-                    'opponent': team_names.get(home_id, 'Unknown'),
-                    'score': f"{away_score}-{home_score}",
-                    'gw': gameweek,
-                    'home': False
-                })
-                
-                table[home_id]['L'] += 1
-                table[home_id]['Form'].append('L')
-                table[home_id]['FormDetails'].append({
-                    'result': 'L',
-                    'opponent': team_names.get(away_id, 'Unknown'),
-                    'score': f"{home_score}-{away_score}",
-                    'gw': gameweek,
-                    'home': True
-                })
-            else:
-                table[home_id]['D'] += 1
-                table[home_id]['Pts'] += 1
-                table[home_id]['Form'].append('D')
-                table[home_id]['FormDetails'].append({
-                    'result': 'D',
-                    'opponent': team_names.get(away_id, 'Unknown'),
-                    'score': f"{home_score}-{away_score}",
-                    'gw': gameweek,
-                    'home': True
-                })
-                
-                table[away_id]['D'] += 1
-                table[away_id]['Pts'] += 1
-                table[away_id]['Form'].append('D')
-                table[away_id]['FormDetails'].append({
-                    'result': 'D',
-                    'opponent': team_names.get(home_id, 'Unknown'),
-                    'score': f"{away_score}-{home_score}",
-                    'gw': gameweek,
-                    'home': False
-                })
-    # Convert to DataFrame
-    df = pd.DataFrame(table.values())
+    # Remap team ids to dense 0..N-1 positions once, then aggregate per-team totals
+    team_ids = df['team_id'].to_numpy()
+    team_idx = pd.Index(team_ids).get_indexer(long['team_id'])
+    gf = long['gf'].to_numpy(dtype=np.int64)
+    ga = long['ga'].to_numpy(dtype=np.int64)
+    for column, values in _aggregate_results(team_idx, gf, ga, len(team_ids)).items():
+        df[column] = values
     
-    # Add team_id for later reference
-    df['team_id'] = list(table.keys())
+    # Form string (last 5 results) and detailed form data for tooltips
+    form = long.groupby('team_id', sort=False)['form_icon'].agg(''.join).str[-5:]
+    venue = pd.Series(np.where(long['home'], 'H', 'A'), index=long.index)
+    long['tooltip'] = 'GW' + long['gw'].astype(str) + ': ' + long['result'] + ' ' + long['score'] + ' vs ' + long['opponent'] + ' (' + venue + ')'
+    long['details'] = long[['result', 'opponent', 'score', 'gw', 'home', 'tooltip']].to_dict('records')
+    form_details = long.groupby('team_id', sort=False)['details'].agg(list)
+    df['Form'] = df['team_id'].map(form).fillna('')
+    df['FormDetails'] = [form_details.get(team_id, []) for team_id in df['team_id']]
     
-    # Sort by Points, then GD, then GF
-    df = df.sort_values(by=['Pts', 'GD', 'GF'], ascending=False).reset_index(drop=True)
+    # Sort by Points, then GD, then GF (lexsort keys are least significant first; negated for descending)
+    order = np.lexsort((-df['GF'].to_numpy(), -df['GD'].to_numpy(), -df['Pts'].to_numpy()))
+    df = df.iloc[order].reset_index(drop=True)
     
     # Add Position column
     df.index += 1
@@ -140,57 +145,25 @@ def calculate_league_table(teams, fixtures):
     df = df.reset_index()
     
     # Calculate previous position (position before last gameweek's fixtures)
-    # Get the most recent gameweek
-    completed_gws = set()
-    for fixture in fixtures:
-        if fixture['finished_provisional']:
-            completed_gws.add(fixture.get('event', 0))
-    
-    if completed_gws:
-        latest_gw = max(completed_gws)
+    if not long.empty:
+        latest_gw = long['gw'].max()
         
         # Recalculate table excluding last gameweek
-        prev_table = {team['id']: {'Pts': 0, 'GD': 0, 'GF': 0} for team in teams}
-        
-        for fixture in fixtures:
-            if fixture['finished_provisional'] and fixture.get('event', 0) < latest_gw:
-                home_id = fixture['team_h']
-                away_id = fixture['team_a']
-                home_score = fixture['team_h_score']
-                away_score = fixture['team_a_score']
-                
-                prev_table[home_id]['GF'] += home_score
-                prev_table[home_id]['GD'] += (home_score - away_score)
-                prev_table[away_id]['GF'] += away_score
-                prev_table[away_id]['GD'] += (away_score - home_score)
-                
-                if home_score > away_score:
-                    prev_table[home_id]['Pts'] += 3
-                elif away_score > home_score:
-                    prev_table[away_id]['Pts'] += 3
-                else:
-                    prev_table[home_id]['Pts'] += 1
-                    prev_table[away_id]['Pts'] += 1
-        
-        # Sort previous table
-        prev_df = pd.DataFrame([(tid, d['Pts'], d['GD'], d['GF']) for tid, d in prev_table.items()],
-                              columns=['team_id', 'Pts', 'GD', 'GF'])
-        prev_df = prev_df.sort_values(by=['Pts', 'GD', 'GF'], ascending=False).reset_index(drop=True)
-        prev_df.index += 1
-        prev_positions = dict(zip(prev_df['team_id'], prev_df.index))
+        earlier = (long['gw'] < latest_gw).to_numpy()
+        prev_totals = _aggregate_results(team_idx[earlier], gf[earlier], ga[earlier], len(team_ids))
+        prev_df = pd.DataFrame({
+            'team_id': team_ids,
+            'Pts': prev_totals['Pts'],
+            'GD': prev_totals['GD'],
+            'GF': prev_totals['GF'],
+        })
+        prev_positions = _rank_positions(prev_df)
         
         # Add previous position to main df
         df['PrevPos'] = df['team_id'].map(prev_positions)
     else:
         df['PrevPos'] = df['Pos']
     
-    # Keep FormDetails for tooltip generation, format Form for display
-    def format_form(form_list):
-        last_5 = form_list[-5:]
-        return "".join(['✅' if x == 'W' else '➖' if x == 'D' else '❌' for x in last_5])
-        
-    df['Form'] = df['Form'].apply(format_form)
-    
     # Reorder columns (keep FormDetails for later use)
     df = df[['Pos', 'PrevPos', 'Logo', 'Team', 'P', 'W', 'D', 'L', 'GF', 'GA', 'GD', 'Pts', 'Form', 'FormDetails']]
     
@@ -242,36 +215,27 @@ def generate_match_commentary(team1: FplTeam, team2: FplTeam, team1_points: int,
         
         # Check for defender/goalkeeper hauls (>10 points)
         for player, data in winning_players_with_points:
-            if player.element_type in [1, 2] and data.points >= 10:  # GK or DEF
+            if data.points >= 10 and player.element_type in GK_DEF_TYPES:
                 defender_haul = (player, data)
                 break
     
-    # Count players yet to play
-    losing_yet_to_play = 0
-    winning_yet_to_play = 0
+    # Count players yet to play: clubs with a fixture still to kick off (a set, so double gameweeks count too)
+    clubs_yet_to_play = {
+        club_id
+        for fixture in live_fixtures if not fixture.started
+        for club_id in (fixture.home_team, fixture.away_team)
+    }
     
-    for player in losing_xi:
-        live_data = live_player_data_map.get(player.id)
-        if live_data and live_data.minutes == 0:
-            # Check if their fixture hasn't started
-            player_has_upcoming = False
-            for fixture in live_fixtures:
-                if (fixture.home_team == player.club_id or fixture.away_team == player.club_id) and not fixture.started:
-                    player_has_upcoming = True
-                    break
-            if player_has_upcoming:
-                losing_yet_to_play += 1
+    def count_yet_to_play(xi):
+        count = 0
+        for player in xi:
+            live_data = live_player_data_map.get(player.id)
+            if live_data and live_data.minutes == 0 and player.club_id in clubs_yet_to_play:
+                count += 1
+        return count
     
-    for player in winning_xi:
-        live_data = live_player_data_map.get(player.id)
-        if live_data and live_data.minutes == 0:
-            player_has_upcoming = False
-            for fixture in live_fixtures:
-                if (fixture.home_team == player.club_id or fixture.away_team == player.club_id) and not fixture.started:
-                    player_has_upcoming = True
-                    break
-            if player_has_upcoming:
-                winning_yet_to_play += 1
+    losing_yet_to_play = count_yet_to_play(losing_xi)
+    winning_yet_to_play = count_yet_to_play(winning_xi)
     
     # Generate commentary based on situation
     if defender_haul:
@@ -354,4 +318,18 @@ def generate_match_commentary(team1: FplTeam, team2: FplTeam, team1_points: int,
         ]
         base += random.choice(both_remaining)
     
-    return base
\ No newline at end of file
+    return base
+
+@st.cache_data(ttl=120, show_spinner=False)
+def cached_match_commentary(state_key: tuple, _team1: FplTeam, _team2: FplTeam, _team1_points: int, _team2_points: int,
+                            _team1_xi: List[Player], _team2_xi: List[Player],
+                            _live_player_data_map: dict, _element_types_map: dict,
+                            _live_fixtures: List[Fixture]) -> str:
+    """
+    Memoized generate_match_commentary. Only state_key is hashed, so it must capture every
+    input the commentary depends on (teams, scores, XI points/minutes, fixture statuses).
+    This also keeps the randomly chosen line stable across reruns until the match state changes.
+    """
+    return generate_match_commentary(_team1, _team2, _team1_points, _team2_points,
+                                     _team1_xi, _team2_xi, _live_player_data_map, _element_types_map,
+                                     _live_fixtures)